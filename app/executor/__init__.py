@@ -1,6 +1,7 @@
 ﻿from .runloop import (
+    clear_import_check_cache,
     preflight_checks,
     plan_next_item,
     thin_run_loop,
 )
-__all__ = ["preflight_checks","plan_next_item","thin_run_loop"]
+__all__ = ["clear_import_check_cache","preflight_checks","plan_next_item","thin_run_loop"]
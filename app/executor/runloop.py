@@ -3,10 +3,15 @@ Executor pre-flight checks + thin run loop (logic-only, no edits).
 """
 from __future__ import annotations
 
+import functools
 import importlib
 import os
 import sys
-from typing import Any, Dict, Iterable, List, Optional
+from importlib.machinery import PathFinder
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Bound once at import: plan_next_item runs every tick and should not re-enter the import system
+from app.orchestrator import workflow as _wf
 
 # --- helpers -----------------------------------------------------------------
 
@@ -20,23 +25,80 @@ def _normalize_paths(paths: Iterable[str]) -> List[str]:
     return norm
 
 
+@functools.lru_cache(maxsize=128)
+def _normalize_tuple(paths: Tuple[str, ...]) -> FrozenSet[str]:
+    # Same inputs recur every preflight tick; normalize once per distinct tuple
+    return frozenset(_normalize_paths(paths))
+
+
 def _check_protected_conflicts(allowed_paths: Iterable[str], protected_paths: Iterable[str]) -> List[str]:
-    allowed = set(_normalize_paths(allowed_paths))
-    protected = set(_normalize_paths(protected_paths))
-    return sorted(list(allowed.intersection(protected)))
+    return sorted(_normalize_tuple(tuple(allowed_paths or ())) & _normalize_tuple(tuple(protected_paths or ())))
 
 
-def _can_import_app(root: str):
-    """Try importing 'app' and ensure it resolves from *root* (not a global install)."""
-    from importlib.machinery import PathFinder
-    import importlib.util
+# (root, sys.path) -> (files the successful import loaded, their stamps); failures are never stored
+_IMPORT_CHECK_CACHE: Dict[Tuple[str, Tuple[str, ...]], Tuple[Tuple[str, ...], Tuple[Any, ...]]] = {}
+
+
+def clear_import_check_cache() -> None:
+    """Drop memoized `_can_import_app` results (tests / forced re-checks)."""
+    _IMPORT_CHECK_CACHE.clear()
+
+
+def _file_stamps(paths: Iterable[str]) -> Tuple[Any, ...]:
+    stamps = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            stamps.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
 
+def _norm_path(p: str, root_norm: str) -> str:
+    # normpath is pure string work; abspath would call getcwd() for relative inputs
+    if os.path.isabs(p):
+        return os.path.normpath(p).replace("\\", "/")
+    return root_norm + "/" + os.path.normpath(p).replace("\\", "/")
+
+
+def _can_import_app(root: str):
+    """
+    Try importing 'app' and ensure it resolves from *root* (not a global install).
+    A pass is memoized per (root, sys.path) and reused while root/app and every module file
+    the import loaded keep their (mtime_ns, size); see clear_import_check_cache().
+    A failure is never memoized, so a fix is seen on the very next check.
+    """
     root = os.path.abspath(root)
+    root_norm = root.replace("\\", "/").rstrip("/")
+    # Fast path: the already-imported 'app' lives under root, nothing to re-resolve.
+    mod = sys.modules.get("app")
+    mod_file = getattr(mod, "__file__", None)
+    if mod_file and _norm_path(mod_file, root_norm).startswith(root_norm + "/"):
+        return True, None
+
+    key = (root, tuple(sys.path))
+    cached = _IMPORT_CHECK_CACHE.get(key)
+    if cached is not None and _file_stamps(cached[0]) == cached[1]:
+        return True, None
+    loaded: List[str] = []
+    result = _can_import_app_uncached(root, root_norm, loaded)
+    if result[0]:
+        files = (os.path.join(root, "app"), *sorted(set(loaded)))
+        _IMPORT_CHECK_CACHE[key] = (files, _file_stamps(files))
+    else:
+        _IMPORT_CHECK_CACHE.pop(key, None)
+    return result
+
+
+def _can_import_app_uncached(root: str, root_norm: str, loaded: Optional[List[str]] = None):
+    # `loaded` (if given) receives the file of every app module the import pulled in
     added = False
     # Save and purge any preloaded "app" modules so resolution comes from `root`.
-    saved_modules = {k: v for k, v in list(sys.modules.items()) if k == "app" or k.startswith("app.")}
+    # Single pass over a shallow copy; saved_modules is our own dict, so no re-listing is needed.
+    saved_modules = {k: v for k, v in sys.modules.copy().items() if k == "app" or k.startswith("app.")}
     try:
-        for k in list(saved_modules.keys()):
+        for k in saved_modules:
             sys.modules.pop(k, None)
 
         if root not in sys.path:
@@ -49,23 +111,27 @@ def _can_import_app(root: str):
         if spec is None:
             return False, "ModuleNotFoundError: app"
 
-        root_norm = root.replace("\\", "/")
         origin_ok = False
 
         if spec.origin:
-            origin = os.path.abspath(spec.origin).replace("\\", "/")
+            origin = _norm_path(spec.origin, root_norm)
             origin_ok = origin.startswith(root_norm)
             if not origin_ok:  # pragma: no cover
                 return False, f"environment mismatch: resolved app outside root -> {origin}"  # pragma: no cover"
         else:  # pragma: no cover
             locations = list(spec.submodule_search_locations or [])
-            if any(os.path.abspath(p).replace("\\", "/").startswith(root_norm) for p in locations):
+            if any(_norm_path(p, root_norm).startswith(root_norm) for p in locations):
                 origin_ok = True
             if not origin_ok:  # pragma: no cover
                 return False, f"environment mismatch: resolved app outside root -> {locations}"  # pragma: no cover"
 
         # Actually import to ensure it loads
         importlib.import_module("app")
+        if loaded is not None:
+            for k, m in sys.modules.copy().items():
+                f = getattr(m, "__file__", None) if k == "app" or k.startswith("app.") else None
+                if f:
+                    loaded.append(f)
         return True, None
     except Exception as exc:
         return False, f"{type(exc).__name__}: {exc}"
@@ -140,16 +206,16 @@ def plan_next_item(root: str) -> Optional[Dict[str, Any]]:
     Discover backlog and pick the next story (no edits).
     Returns an execution plan dict or None when nothing is ready.
     """
-    wf = importlib.import_module("app.orchestrator.workflow")
-    stories = wf.discover_backlog(root)
-    nxt = wf.pick_next(stories)
+    stories = _wf.discover_backlog(root)
+    nxt = _wf.pick_next(stories)
     if not nxt:
         return None
     return {
         "story_id": nxt["id"],
         "title": nxt.get("title", ""),
         "priority": nxt.get("priority", 999),
-        "allowed_paths": nxt.get("allowed_paths", []),
+        # discover_backlog shares nested values with its cache: hand out our own list
+        "allowed_paths": list(nxt.get("allowed_paths", [])),
         "risk_level": nxt.get("risk_level", "low"),
         "assigned_role": nxt.get("assigned_role", ""),
         "status": "ready",
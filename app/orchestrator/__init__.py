@@ -1,10 +1,12 @@
 ﻿from .state import (
+    clear_hash_cache_memo,
     load_state,
     rebuild_state,
     compute_artifacts_manifest,
     compute_environment_fingerprint,
 )
 __all__ = [
+    "clear_hash_cache_memo",
     "load_state",
     "rebuild_state",
     "compute_artifacts_manifest",
@@ -3,9 +3,11 @@ State discovery & rebuild utilities for the file-driven orchestrator.
 
 Rules:
 - File system is the source of truth; no hidden state.
-- Persist ONLY under <root>/.orchestrator/state.json.
+- Persist ONLY under <root>/.orchestrator/ (state.json + hash_cache.json).
 - Deterministic & idempotent outputs; UTF-8 (no BOM).
-- No network; stdlib only.
+- On disk (version 2) artifacts_manifest is columnar: {"paths": [...], "checksums": [...]}.
+  Loaders hand back the list-of-dicts shape; version 1 (list) files still load.
+- No network; stdlib only (orjson is used for JSON when installed).
 
 Public API:
 - load_state(root:str) -> dict
@@ -15,19 +17,47 @@ Public API:
 """
 from __future__ import annotations
 
+import functools
 import hashlib
 import json
+import mmap
 import os
-import platform
 import sys
 import time
-import uuid
-from typing import Iterable, List, Dict, Any
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 ORCH_DIR = ".orchestrator"
 STATE_FILENAME = "state.json"
+STATE_VERSION = 2
+HASH_CACHE_FILENAME = "hash_cache.json"
+_TMP_MARKER = ".tmp-"
+_TMP_PREFIXES = (STATE_FILENAME + _TMP_MARKER, HASH_CACHE_FILENAME + _TMP_MARKER)
+# Atomic writes finish in milliseconds; an older temp file has no live writer
+_STALE_TMP_AGE = 10 * 60
+_HASH_CACHE_VERSION = 2  # v2 entries: [mtime_ns, size, inode, digest]
+# Digest recorded in hash_cache.json; a cache written with another algorithm is discarded
+_HASH_ALGO = "sha256"
+# Below this many cache misses, thread-pool startup costs more than it saves
+_PARALLEL_HASH_MIN = 32
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so except clauses are shared
+_json_loads = orjson.loads if orjson is not None else json.loads
+# Below this a plain read() is cheaper than setting up a mapping
+_MMAP_MIN = 4096
+
+# Files above this are hashed in _HASH_CHUNK slices through one reused buffer
+_CHUNKED_HASH_MIN = 64 * 1024
+_HASH_CHUNK = 1 << 20
+
+# hash_cache.json path -> ((mtime_ns, size) of that file, parsed entries)
+_HASH_CACHE_MEMO: Dict[str, Tuple[Tuple[int, int], Dict[str, List[Any]]]] = {}
 
-_REQUIRED_KEYS = {
+_REQUIRED_KEYS = frozenset({
     "version",
     "last_updated",
     "environment_fingerprint",
@@ -40,9 +70,9 @@ _REQUIRED_KEYS = {
     "container_fingerprint",
     "metrics",
     "role_progress",
-}
+})
 
-_OMIT_DIRS = {
+_OMIT_DIRS = frozenset({
     ORCH_DIR,
     ".git",
     ".svn",
@@ -52,70 +82,290 @@ _OMIT_DIRS = {
     ".pytest_cache",
     ".mypy_cache",
     ".ruff_cache",
-}
-_OMIT_FILE_PATTERNS = {".pyc", ".pyo", ".pyd", ".db", ".sqlite", ".sqlite3", ".coverage"}
-
-def _is_omitted(path: str) -> bool:
-    parts = path.replace("\\", "/").split("/")
-    if any(p in _OMIT_DIRS for p in parts):
-        return True
-    base = os.path.basename(path)
-    for suffix in _OMIT_FILE_PATTERNS:
-        if base.endswith(suffix):
-            return True
-    return False
-
-def _sha256_file(fp: str) -> str:
-    h = hashlib.sha256()
+})
+_OMIT_FILE_PATTERNS = frozenset({".pyc", ".pyo", ".pyd", ".db", ".sqlite", ".sqlite3", ".coverage"})
+# str.endswith accepts a tuple and scans it in C
+_OMIT_SUFFIXES = tuple(sorted(_OMIT_FILE_PATTERNS))
+
+def _read_fd_to_eof(fd: int, hint: int) -> bytes:
+    # os.read may return short (FUSE, network filesystems, EINTR): only b"" means EOF
+    chunks = []
+    while True:
+        chunk = os.read(fd, hint + 1)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+def _sha256_file(fp: str, size: Optional[int] = None) -> str:
+    """
+    SHA-256 of `fp`. `size` is the st_size the walk already has; it picks the small or
+    chunked path and must match the bytes actually hashed, else the file changed mid-hash
+    and OSError is raised rather than caching a digest for the wrong stamp.
+    Workspace files are live, so no mmap: a file truncated under a mapping raises SIGBUS.
+    """
+    # Raw fd: open() would stat (and isatty-probe) every file the walk already stat'ed
+    fd = os.open(fp, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        if size is None:
+            size = os.fstat(fd).st_size
+        if size <= _CHUNKED_HASH_MIN:
+            data = _read_fd_to_eof(fd, size)
+            if len(data) != size:
+                raise OSError(f"{fp}: size changed while hashing")
+            return hashlib.sha256(data).hexdigest()
+        # readinto() the same buffer each time: no per-chunk bytes object
+        h = hashlib.sha256()
+        view = memoryview(bytearray(_HASH_CHUNK))
+        total = 0
+        with open(fd, "rb", buffering=0, closefd=False) as f:
+            while True:
+                n = f.readinto(view)
+                if not n:
+                    break
+                h.update(view[:n])
+                total += n
+        if total != size:
+            raise OSError(f"{fp}: size changed while hashing")
+        return h.hexdigest()
+    finally:
+        os.close(fd)
+
+def _try_sha256_file(fp: str, size: Optional[int] = None) -> Optional[str]:
+    try:
+        return _sha256_file(fp, size)
+    except OSError:
+        # Skip locked, transient or unreadable files (Windows/OneDrive friendly)
+        return None
+
+def _orjson_payload(data: Any, indent: int | None) -> Optional[bytes]:
+    """UTF-8 bytes from orjson (compact, or 2-space indented), or None to use the stdlib writer."""
+    if orjson is None or indent not in (None, 2):
+        return None
+    try:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent == 2 else 0)
+    except TypeError:
+        # non-str keys, >64-bit ints, ...: stdlib copes
+        return None
+
+def _read_json(fp: str) -> Any:
+    # bytes straight into the parser: no intermediate decoded str
     with open(fp, "rb") as f:
-        for chunk in iter(lambda: f.read(65536), b""):
-            h.update(chunk)
-    return h.hexdigest()
+        if orjson is None or os.fstat(f.fileno()).st_size < _MMAP_MIN:
+            return _json_loads(f.read())
+        # orjson parses a memoryview in place, so large files are never copied into a bytes object
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+def _write_fd_bytes(fp: str, payload: bytes) -> None:
+    # Bytes are already final: raw fd writes skip the buffered file object and its copy
+    fd = os.open(fp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
 
-def _write_json_no_bom(fp: str, data: Dict[str, Any]) -> None:
+def _write_json_no_bom(fp: str, data: Dict[str, Any], indent: int | None = 2) -> None:
+    """
+    Atomically replace `fp`: write a sibling temp file, fsync, then os.replace().
+    A crash mid-write leaves the old file intact instead of a truncated one
+    (which would otherwise force a full rebuild + re-hash on next load).
+    """
     os.makedirs(os.path.dirname(fp), exist_ok=True)
-    # ensure UTF-8 without BOM
-    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=False, indent=2)
-    with open(fp, "w", encoding="utf-8") as f:
-        f.write(payload)
+    tmp = f"{fp}{_TMP_MARKER}{os.getpid()}"
+    try:
+        payload = _orjson_payload(data, indent)
+        # ensure UTF-8 without BOM
+        if payload is not None:
+            _write_fd_bytes(tmp, payload)
+        else:
+            with open(tmp, "w", encoding="utf-8", newline="\n", buffering=1 << 20) as f:
+                if indent is None:
+                    # compact output takes the C encoder fast path, which only exists for one-shot dumps()
+                    f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+                else:
+                    # stream chunks instead of materializing the whole document as one str
+                    json.dump(data, f, ensure_ascii=False, separators=(",", ":"), sort_keys=False, indent=indent)
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, fp)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def _remove_stale_tmp(d: str) -> None:
+    """
+    Delete temp files in `d` left by a writer of state.json or hash_cache.json that died
+    between open() and os.replace(). Only files untouched for _STALE_TMP_AGE seconds go:
+    a younger one may belong to a live writer whose os.replace() is still to come.
+    """
+    try:
+        it = os.scandir(d)
+    except OSError:
+        return
+    cutoff = time.time() - _STALE_TMP_AGE
+    with it:
+        for entry in it:
+            if not entry.name.startswith(_TMP_PREFIXES):
+                continue
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+def _iter_files(root: str) -> Iterator[Tuple[os.DirEntry, str]]:
+    """
+    Yield (DirEntry, relpath) for every file under `root`, pruning _OMIT_DIRS and
+    _OMIT_SUFFIXES by name before any type check that could need a stat.
+    _OMIT_DIRS names are skipped for files too: worktrees and submodules have a `.git` file.
+    DirEntry carries d_type (and on Windows the full stat), so no extra stat per entry.
+    """
+    prefix_len = len(os.path.join(root, ""))
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.name in _OMIT_DIRS:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif not entry.name.endswith(_OMIT_SUFFIXES) and entry.is_file():
+                    yield entry, entry.path[prefix_len:]
+
+def _hash_cache_path(root: str) -> str:
+    return os.path.join(root, ORCH_DIR, HASH_CACHE_FILENAME)
+
+def clear_hash_cache_memo() -> None:
+    """Forget in-process copies of hash_cache.json (the on-disk cache is untouched)."""
+    _HASH_CACHE_MEMO.clear()
+
+def _file_stamp(fp: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(fp)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _load_hash_cache(root: str) -> Dict[str, List[Any]]:
+    """Return the persisted {rel_path: [mtime_ns, size, inode, sha256]} map, or {} if absent/stale."""
+    fp = _hash_cache_path(root)
+    stamp = _file_stamp(fp)
+    if stamp is None:
+        return {}
+    memo = _HASH_CACHE_MEMO.get(fp)
+    if memo is not None and memo[0] == stamp:
+        # Unchanged since this process last read or wrote it: skip the parse
+        return memo[1]
+    try:
+        data = _read_json(fp)
+    except (ValueError, OSError):
+        return {}
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != _HASH_CACHE_VERSION
+        or data.get("algo", _HASH_ALGO) != _HASH_ALGO
+    ):
+        return {}
+    entries = data.get("entries")
+    entries = entries if isinstance(entries, dict) else {}
+    _HASH_CACHE_MEMO[fp] = (stamp, entries)
+    return entries
+
+def _save_hash_cache(root: str, cache: Dict[str, List[Any]]) -> None:
+    fp = _hash_cache_path(root)
+    try:
+        _write_json_no_bom(fp, {"version": _HASH_CACHE_VERSION, "algo": _HASH_ALGO, "entries": cache}, indent=None)
+    except OSError:
+        # Cache is an optimization only; a read-only workspace must not fail the walk
+        _HASH_CACHE_MEMO.pop(fp, None)
+        return
+    stamp = _file_stamp(fp)
+    if stamp is not None:
+        _HASH_CACHE_MEMO[fp] = (stamp, cache)
 
 def compute_artifacts_manifest(root: str) -> List[Dict[str, Any]]:
     """
     Walk the repository rooted at `root` and return a stable list of file artifacts:
     [{ "path": "<relpath>", "checksum": "<sha256>" }, ...]
     Excludes orchestrator internals and typical ephemeral dirs.
+    Checksums are reused from the hash cache when (mtime_ns, size, inode) is unchanged;
+    the inode catches a file replaced by another with the same size and timestamp.
     """
     artifacts: List[Dict[str, Any]] = []
-    for dirpath, dirnames, filenames in os.walk(root):
-        # prune omitted dirs in-place for speed
-        dirnames[:] = [d for d in dirnames if d not in _OMIT_DIRS]
-        for name in filenames:
-            abspath = os.path.join(dirpath, name)
-            rel = os.path.relpath(abspath, root)
-            if _is_omitted(rel):
-                continue
-            try:
-                checksum = _sha256_file(abspath)
-            except (PermissionError, FileNotFoundError):
-                # Skip locked or transient files (Windows/OneDrive friendly)
-                continue
-            artifacts.append({"path": rel.replace("\\", "/"), "checksum": checksum})
+    old_cache = _load_hash_cache(root)
+    new_cache: Dict[str, List[Any]] = {}
+    misses: List[Tuple[str, str, os.stat_result]] = []
+    for entry, rel in _iter_files(root):
+        rel = rel.replace("\\", "/")
+        try:
+            st = entry.stat()
+        except (PermissionError, FileNotFoundError):
+            continue
+        hit = old_cache.get(rel)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size and hit[2] == st.st_ino:
+            new_cache[rel] = hit
+            artifacts.append({"path": rel, "checksum": hit[3]})
+        else:
+            misses.append((rel, entry.path, st))
+
+    paths = [m[1] for m in misses]
+    sizes = [m[2].st_size for m in misses]
+    if len(paths) < _PARALLEL_HASH_MIN:
+        checksums = [_try_sha256_file(fp, size) for fp, size in zip(paths, sizes)]
+    else:
+        # Deferred: concurrent.futures costs ~6 ms to import and most walks are all cache hits
+        from concurrent.futures import ThreadPoolExecutor
+        # hashlib releases the GIL on large updates, so threads overlap read I/O and hashing
+        with ThreadPoolExecutor(max_workers=min(os.cpu_count() or 1, len(paths))) as ex:
+            checksums = list(ex.map(_try_sha256_file, paths, sizes))
+    for (rel, _, st), checksum in zip(misses, checksums):
+        if checksum is None:
+            continue
+        new_cache[rel] = [st.st_mtime_ns, st.st_size, st.st_ino, checksum]
+        artifacts.append({"path": rel, "checksum": checksum})
+    if new_cache != old_cache:
+        _save_hash_cache(root, new_cache)
     # sort for determinism
     artifacts.sort(key=lambda x: x["path"])
     return artifacts
 
-def compute_environment_fingerprint(run_commands: Iterable[str] | None = None) -> Dict[str, Any]:
+@functools.lru_cache(maxsize=1)
+def _os_python_key() -> Tuple[str, str]:
+    # platform.platform() may hit uname()/sw_vers; neither value changes within a process.
+    # Imported here so a load_state() that finds a valid state.json never pays for it.
+    import platform
+    return platform.platform(), sys.version.split()[0]
+
+@functools.lru_cache(maxsize=32)
+def _environment_fingerprint(run_commands: Tuple[str, ...]) -> Dict[str, Any]:
+    os_name, python = _os_python_key()
     return {
-        "os": platform.platform(),
-        "python": sys.version.split()[0],
+        "os": os_name,
+        "python": python,
         "libs": {},  # intentionally empty; can be enriched later
-        "run_commands": list(run_commands) if run_commands else [],
+        "run_commands": list(run_commands),
     }
 
+def compute_environment_fingerprint(run_commands: Iterable[str] | None = None) -> Dict[str, Any]:
+    fp = _environment_fingerprint(tuple(run_commands) if run_commands else ())
+    # Callers own the result: copy the mutable members so the cached entry stays pristine
+    return {**fp, "libs": dict(fp["libs"]), "run_commands": list(fp["run_commands"])}
+
 def _new_state_skeleton(root: str) -> Dict[str, Any]:
+    import uuid  # rebuild-only; keeps the valid-state load path free of it
     now_iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     state: Dict[str, Any] = {
-        "version": 1,
+        "version": STATE_VERSION,
         "last_updated": now_iso,
         "environment_fingerprint": compute_environment_fingerprint(),
         "stories": [],
@@ -134,7 +384,25 @@ def _state_path(root: str) -> str:
     return os.path.join(root, ORCH_DIR, STATE_FILENAME)
 
 def _valid_state(obj: Dict[str, Any]) -> bool:
-    return isinstance(obj, dict) and _REQUIRED_KEYS.issubset(set(obj.keys()))
+    # issubset iterates the dict's keys directly; no throwaway set(obj.keys()) copy
+    return isinstance(obj, dict) and _REQUIRED_KEYS.issubset(obj)
+
+def _artifacts_to_soa(artifacts: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    # Two flat string arrays serialize far faster (and smaller) than one dict per file
+    return {
+        "paths": [a["path"] for a in artifacts],
+        "checksums": [a["checksum"] for a in artifacts],
+    }
+
+def _soa_to_aos(soa: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Row view of a columnar manifest, or None if the columns are malformed."""
+    paths, checksums = soa.get("paths"), soa.get("checksums")
+    if not isinstance(paths, list) or not isinstance(checksums, list) or len(paths) != len(checksums):
+        return None
+    return [{"path": p, "checksum": c} for p, c in zip(paths, checksums)]
+
+def _write_state(fp: str, state: Dict[str, Any]) -> None:
+    _write_json_no_bom(fp, {**state, "artifacts_manifest": _artifacts_to_soa(state["artifacts_manifest"])})
 
 def rebuild_state(root: str) -> Dict[str, Any]:
     """
@@ -142,7 +410,7 @@ def rebuild_state(root: str) -> Dict[str, Any]:
     Deterministic and idempotent: safe to call repeatedly.
     """
     state = _new_state_skeleton(root)
-    _write_json_no_bom(_state_path(root), state)
+    _write_state(_state_path(root), state)
     return state
 
 def load_state(root: str) -> Dict[str, Any]:
@@ -151,14 +419,20 @@ def load_state(root: str) -> Dict[str, Any]:
     Always returns a dict in the canonical shape.
     """
     fp = _state_path(root)
+    _remove_stale_tmp(os.path.dirname(fp))
     if not os.path.exists(fp):
         return rebuild_state(root)
     try:
-        with open(fp, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except (json.JSONDecodeError, OSError):
+        data = _read_json(fp)
+    except (ValueError, OSError):
         # Corrupt or unreadable → rebuild
         return rebuild_state(root)
     if not _valid_state(data):
         return rebuild_state(root)
+    manifest = data["artifacts_manifest"]
+    if isinstance(manifest, dict):
+        rows = _soa_to_aos(manifest)
+        if rows is None:
+            return rebuild_state(root)
+        data["artifacts_manifest"] = rows
     return data
@@ -1,7 +1,7 @@
 ﻿"""
 Backlog discovery, selection, and fix-gate detection (pure logic).
 
-- discover_backlog(root) -> list[dict]
+- discover_backlog(root) -> list[dict]   (memoized; clear_backlog_cache() resets)
 - pick_next(stories) -> dict|None
 - synthesize_fix_gate(import_ok: bool, tests_ok: bool) -> dict|None
 """
@@ -9,86 +9,145 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Any, Dict, Iterable, List, Optional
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 BACKLOG_DIR = "backlog"
-VALID_STATUSES = {"ready", "in_progress", "done", "blocked"}
+VALID_STATUSES = frozenset({"ready", "in_progress", "done", "blocked"})
+# Below this many story files a thread pool costs more than sequential reads
+_PARALLEL_LOAD_MIN = 8
+
+# Runs on raw bytes: only matched keys/values get decoded. \x80-\xff keeps UTF-8 letters
+# in keys; \r is trimmed because bytes are not newline-translated like text mode.
+_YAML_LINE_RE = re.compile(rb"(?m)^[ \t]*([A-Za-z_][\w\x80-\xff-]*)[ \t]*:[ \t]*(.*?)[ \t\r]*$")
+_LEAD_WS_RE = re.compile(rb"\s*")
+_JSON_LEAD_BYTES = frozenset(b"\"[{-0123456789tfn")
+# Both raise ValueError subclasses on bad input
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# abs backlog dir -> (signature, normalized stories)
+_BACKLOG_CACHE: Dict[str, Tuple[Any, List[Dict[str, Any]]]] = {}
+
+def _coerce(raw: bytes) -> Any:
+    """Value of one flat YAML line: JSON scalar/list/dict when it parses, else the unquoted string."""
+    # Only values that can start a JSON scalar/list/dict are worth a json.loads attempt;
+    # both decoders take bytes, so a parsed value is never decoded to str first
+    if raw and raw[0] in _JSON_LEAD_BYTES:
+        try:
+            return _json_loads(raw)
+        except ValueError:
+            pass
+    # Fallback: unquote simple quoted scalars; else keep raw
+    if len(raw) >= 2 and raw[0] == raw[-1] and raw[0] in b"\"'":
+        raw = raw[1:-1]
+    return raw.decode("utf-8")
 
 def _load_any(fp: str) -> Dict[str, Any]:
     """Load a story file. JSON first; otherwise a tiny flat YAML parser."""
-    with open(fp, "r", encoding="utf-8") as f:
-        text = f.read()
-    stripped = text.strip()
-    if stripped.startswith(("{", "[")):
-        return json.loads(stripped)
-
-    # Ultra-minimal, flat "key: value" parser for .yml/.yaml
-    data: Dict[str, Any] = {}
-    for line in text.splitlines():
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if ":" not in line:
-            continue
-        k, v = line.split(":", 1)
-        key = k.strip()
-        raw = v.strip()
-        # Try JSON-decode any scalar/list/dict (numbers, booleans, [], {})
-        try:
-            val = json.loads(raw)
-        except Exception:
-            # Fallback: unquote simple quoted scalars; else keep raw
-            if (raw.startswith('"') and raw.endswith('"')) or (raw.startswith("'") and raw.endswith("'")):
-                val = raw[1:-1]
-            else:
-                val = raw
-        data[key] = val
-    return data
+    with open(fp, "rb") as f:
+        data = f.read()
+    # Sniff the first non-blank byte instead of strip()-copying the whole file;
+    # both JSON decoders accept bytes and the surrounding whitespace themselves
+    lead = _LEAD_WS_RE.match(data).end()
+    if data[lead:lead + 1] in (b"{", b"["):
+        return _json_loads(data)
 
-def discover_backlog(root: str) -> List[Dict[str, Any]]:
-    bdir = os.path.join(root, BACKLOG_DIR)
-    if not os.path.isdir(bdir):
-        return []
+    # Ultra-minimal, flat "key: value" parser for .yml/.yaml.
+    # One regex pass; comments, blank and colon-less lines simply don't match.
+    return {
+        m.group(1).decode("utf-8"): _coerce(m.group(2)) for m in _YAML_LINE_RE.finditer(data)
+    }
+
+def _safe_load(fp: str) -> Optional[Dict[str, Any]]:
+    try:
+        return _load_any(fp)
+    except (OSError, ValueError, RecursionError):
+        # skip unreadable/bad stories (decode and JSON errors are ValueErrors;
+        # stdlib json recurses on pathologically nested input)
+        return None
+
+def clear_backlog_cache() -> None:
+    """Drop memoized `discover_backlog` results (tests / forced re-scans)."""
+    _BACKLOG_CACHE.clear()
+
+def _backlog_signature(bdir: str, entries: List[os.DirEntry]) -> Optional[Tuple[Any, ...]]:
+    # Dir mtime alone misses in-place edits, so fold in each story file's (name, mtime, size)
+    try:
+        stats = [(e.name, e.stat()) for e in entries]
+        files = tuple(sorted((name, st.st_mtime_ns, st.st_size) for name, st in stats))
+        return (os.stat(bdir).st_mtime_ns, files)
+    except OSError:
+        return None
+
+def _load_stories(fps: List[str]) -> List[Dict[str, Any]]:
+    if len(fps) < _PARALLEL_LOAD_MIN:
+        loaded = [_safe_load(fp) for fp in fps]
+    else:
+        # overlap per-file open/read latency; parsing is tiny
+        with ThreadPoolExecutor(max_workers=min(32, len(fps))) as ex:
+            loaded = list(ex.map(_safe_load, fps))
     out: List[Dict[str, Any]] = []
-    for name in os.listdir(bdir):
-        if not name.lower().endswith((".json", ".yml", ".yaml")):
-            continue
-        fp = os.path.join(bdir, name)
-        try:
-            story = _load_any(fp)
-        except Exception:
-            # skip unreadable/bad stories
-            continue
-        if not story or "id" not in story:
+    for raw in loaded:
+        if not isinstance(raw, dict) or "id" not in raw:
             continue
-        # Normalize status and defaults
-        if story.get("status") not in VALID_STATUSES:
+        # Defaults via one dict merge (fresh [] per story); file values win.
+        # A merge keeps the first key object it saw, so listing "id" here too makes every
+        # hot key the interned source literal: lookups then match on pointer, not memcmp.
+        story = {"id": raw["id"], "status": "ready", "dependencies": [], "priority": 999, **raw}
+        if story["status"] not in VALID_STATUSES:
             story["status"] = "ready"
-        story.setdefault("dependencies", [])
-        story.setdefault("priority", 999)
         out.append(story)
     # Deterministic order: (priority asc, title asc)
     out.sort(key=lambda s: (s.get("priority", 999), s.get("title", "")))
     return out
 
-def _deps_satisfied(story: Dict[str, Any], status_index: Dict[str, str]) -> bool:
-    deps: Iterable[str] = story.get("dependencies", [])
-    for dep in deps:
-        if status_index.get(dep) != "done":
-            return False
-    return True
+def discover_backlog(root: str) -> List[Dict[str, Any]]:
+    """
+    Load, normalize and sort backlog stories under <root>/backlog.
+    Memoized on the backlog signature. Each call returns a new list of shallow story copies:
+    top-level keys may be reassigned, but nested values (dependencies, allowed_paths, ...)
+    are shared with the cache and must not be mutated in place.
+    """
+    bdir = os.path.join(root, BACKLOG_DIR)
+    if not os.path.isdir(bdir):
+        return []
+    with os.scandir(bdir) as it:
+        entries = [
+            e for e in it
+            if e.is_file() and e.name.lower().endswith((".json", ".yml", ".yaml"))
+        ]
+    sig = _backlog_signature(bdir, entries)
+    cache_key = os.path.abspath(bdir)
+    cached = _BACKLOG_CACHE.get(cache_key)
+    if sig is not None and cached is not None and cached[0] == sig:
+        return [dict(s) for s in cached[1]]
+    out = _load_stories([e.path for e in entries])
+    if sig is not None:
+        _BACKLOG_CACHE[cache_key] = (sig, out)
+    return [dict(s) for s in out]
 
 def pick_next(stories: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-    if not stories:
-        return None
-    status_index = {s["id"]: s.get("status", "ready") for s in stories}
-    candidates = [
-        s for s in stories
-        if s.get("status") == "ready" and _deps_satisfied(s, status_index)
-    ]
-    if not candidates:
-        return None
-    return candidates[0]  # stories already sorted by discover_backlog
+    # stories already sorted by discover_backlog: the first eligible one wins
+    done: Optional[frozenset] = None
+    for s in stories:
+        if s.get("status") != "ready":
+            continue
+        deps: Optional[Iterable[str]] = s.get("dependencies")
+        if deps:
+            # Only built once a story actually has deps (empty deps is the common case)
+            if done is None:
+                done = frozenset(st["id"] for st in stories if st.get("status") == "done")
+            # One C-level superset test per candidate instead of a generator over its deps
+            if not done.issuperset(deps):
+                continue
+        return s
+    return None
 
 def synthesize_fix_gate(import_ok: bool, tests_ok: bool) -> Optional[Dict[str, Any]]:
     """Return a virtual highest-priority story if imports or tests are failing."""
@@ -34,18 +34,32 @@ SECURITY & COMPLIANCE GUARDRAILS
 
 from __future__ import annotations
 import argparse
+import functools
+import importlib
 import json
+import mmap
 import os
 import re
 import sys
 import time
-import uuid
 import platform
+import site
+import shlex
 import subprocess
+import threading
 import hashlib
+import heapq
 import glob
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple, Set
+from importlib.metadata import distributions
+from typing import Any, Callable, Dict, FrozenSet, IO, List, Optional, Tuple, Set, Union
+
+try:
+    import orjson  # optional: C-speed JSON for state/backlog files; stdlib json otherwise
+except ImportError:  # pragma: no cover
+    orjson = None
 
 # =========================
 # 0) PARAMETERS (declare + enforce)
@@ -75,9 +89,17 @@ STATE_DIR = os.path.join(WORKSPACE_ROOT, ".orchestrator")
 STATE_PATH = os.path.join(STATE_DIR, "state.json")
 OVERRIDES_DIR = os.path.join(STATE_DIR, "overrides")
 
+# (dir relpath with '/', has any .py, has __init__.py), from _enumerate_py_package_dirs
+PkgDir = Tuple[str, bool, bool]
+
+_ROUTER_PAT = re.compile(rb"router =|APIRouter\(")  # same markers the substring checks used
+
 # Regex helpers
 RE_EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
 RE_PHONE = re.compile(r"\b(?:\+?\d{1,3}[-.\s]?)?(?:\d{3}[-.\s]?){2}\d{4}\b")
+# Both scrubbers as one alternation so a matching line is scanned once
+_PII_RE = re.compile(f"(?P<email>{RE_EMAIL.pattern})|(?P<phone>{RE_PHONE.pattern})")
+_HAS_DIGIT = re.compile(r"\d")
 
 # Classification codes
 BLOCKED_NEEDS_OVERRIDE = "blocked_needs_override"
@@ -92,18 +114,86 @@ ENVIRONMENT_MISMATCH = "environment_mismatch"
 def now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
-def sha256_of_file(path: str) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(65536), b""):
-            h.update(chunk)
-    return h.hexdigest()
+if hasattr(hashlib, "file_digest"):
+    def sha256_of_file(path: str) -> str:
+        # 3.11+: read loop runs in C with a reused buffer
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+else:
+    def sha256_of_file(path: str) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+_PARALLEL_HASH_MIN = 32  # below this a thread pool costs more than it overlaps
+
+def sha256_many(paths: List[str]) -> List[str]:
+    # hashlib releases the GIL while hashing, so threads overlap both the reads and the digests
+    if len(paths) < _PARALLEL_HASH_MIN:
+        return [sha256_of_file(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        return list(ex.map(sha256_of_file, paths))
+
+def checksums_with_stat_cache(rel_paths: List[str], stat_cache: Dict[str, List[Any]]) -> Dict[str, str]:
+    """
+    sha256 per existing rel path, reusing stat_cache[rel] = [mtime_ns, size, sha] when the
+    file's stat is unchanged; only the misses are hashed (and written back to the cache).
+    """
+    found: Dict[str, str] = {}
+    misses: List[Tuple[str, str, List[int]]] = []
+    for rel in rel_paths:
+        ap = os.path.join(WORKSPACE_ROOT, rel)
+        try:
+            st = os.stat(ap)
+        except OSError:
+            continue
+        stamp = [st.st_mtime_ns, st.st_size]
+        cached = stat_cache.get(rel)
+        if cached and cached[:2] == stamp:
+            found[rel] = cached[2]
+        else:
+            misses.append((rel, ap, stamp))
+    for (rel, _, stamp), sha in zip(misses, sha256_many([ap for _, ap, _ in misses])):
+        stat_cache[rel] = stamp + [sha]
+        found[rel] = sha
+    # Keep touched_files order for the checkpoint output
+    return {rel: found[rel] for rel in rel_paths if rel in found}
+
+_URAND_POOL_SIZE = 16 * 256
+_URAND_POOL = b""
+_URAND_OFF = 0
+_URAND_LOCK = threading.Lock()
+
+def fast_uuid4_str() -> str:
+    """
+    RFC 4122 version-4 UUID string, carved from a 4 KiB os.urandom pool so 256 tokens
+    cost one getrandom() call instead of one each. Same format as str(uuid.uuid4()).
+    """
+    global _URAND_POOL, _URAND_OFF
+    with _URAND_LOCK:
+        if _URAND_OFF + 16 > len(_URAND_POOL):
+            _URAND_POOL, _URAND_OFF = os.urandom(_URAND_POOL_SIZE), 0
+        b = bytearray(_URAND_POOL[_URAND_OFF:_URAND_OFF + 16])
+        _URAND_OFF += 16
+    b[6] = (b[6] & 0x0F) | 0x40
+    b[8] = (b[8] & 0x3F) | 0x80
+    h = b.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+def _pii_repl(m: "re.Match[str]") -> str:
+    return "[email_redacted]" if m.lastgroup == "email" else "[phone_redacted]"
+
+def scrub_pii(s: str) -> str:
+    # Emails need "@", phones need digits; most log lines have neither and skip the regex entirely
+    if "@" in s or _HAS_DIGIT.search(s):
+        s = _PII_RE.sub(_pii_repl, s)
+    return s
 
 def safe_print(s: str) -> None:
     # PII scrub for orchestrator logs while preserving structure
-    s = RE_EMAIL.sub("[email_redacted]", s)
-    s = RE_PHONE.sub("[phone_redacted]", s)
-    print(s, flush=True)
+    print(scrub_pii(s), flush=True)
 
 def retry_read(path: str, mode: str = "r", attempts: int = 3, delay: float = 0.25):
     for i in range(attempts):
@@ -115,37 +205,89 @@ def retry_read(path: str, mode: str = "r", attempts: int = 3, delay: float = 0.2
                 raise
             time.sleep(delay)
 
-def retry_write(path: str, data: str, attempts: int = 3, delay: float = 0.25):
+def _retry_open_write(path: str, write_fn: Callable[[IO[Any]], None], attempts: int = 3, delay: float = 0.25,
+                      binary: bool = False):
     os.makedirs(os.path.dirname(path), exist_ok=True)
     for i in range(attempts):
         try:
-            with open(path, "w", encoding="utf-8", newline="\n") as f:
-                f.write(data)
+            if binary:
+                f = open(path, "wb", buffering=1 << 20)
+            else:
+                f = open(path, "w", encoding="utf-8", newline="\n", buffering=1 << 20)
+            with f:
+                write_fn(f)
             return
         except Exception:
             if i == attempts - 1:
                 raise
             time.sleep(delay)
 
-def run_cmd(cmd: str, cwd: Optional[str] = None, timeout: Optional[int] = None) -> Tuple[int, str, str]:
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, cwd=cwd)
+def retry_write(path: str, data: str, attempts: int = 3, delay: float = 0.25):
+    _retry_open_write(path, lambda f: f.write(data), attempts, delay)
+
+def _split_cmd(cmd: Union[str, List[str]]) -> List[str]:
+    # Exec directly (no cmd.exe / sh wrapper): one process per call instead of two
+    return shlex.split(cmd, posix=(os.name != "nt")) if isinstance(cmd, str) else list(cmd)
+
+def run_cmd_tail(cmd: Union[str, List[str]], cwd: Optional[str] = None, timeout: Optional[int] = None,
+                 max_lines: int = 1024, on_line: Optional[Callable[[str], None]] = None,
+                 env: Optional[Dict[str, str]] = None) -> Tuple[int, str, str]:
+    """
+    Run `cmd` without a shell, folding stderr into stdout and streaming line by line: `on_line` sees
+    every line as it arrives and only the last `max_lines` are kept, so memory stays bounded
+    however chatty the command is. Returns (code, tail, "").
+    """
     try:
-        out, err = proc.communicate(timeout=timeout)
-    except subprocess.TimeoutExpired:
+        proc = subprocess.Popen(_split_cmd(cmd), cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, encoding="utf-8", errors="replace", bufsize=1)
+    except OSError as e:
+        return 127, f"{type(e).__name__}: {e}", ""
+    killed: List[bool] = []
+    def _kill() -> None:
+        killed.append(True)
         proc.kill()
-        out, err = proc.communicate()
-    return proc.returncode, out.decode("utf-8", errors="replace"), err.decode("utf-8", errors="replace")
+    timer = threading.Timer(timeout, _kill) if timeout else None
+    ring: "deque[str]" = deque(maxlen=max_lines)
+    try:
+        if timer:
+            timer.start()
+        with proc:
+            for line in proc.stdout:
+                line = line.rstrip("\r\n")
+                ring.append(line)
+                if on_line:
+                    on_line(line)
+    finally:
+        if timer:
+            timer.cancel()
+    return (-1 if killed else proc.returncode), "\n".join(ring), ""
+
+def iter_workspace_files(root: str):
+    """
+    Yield (DirEntry, relpath) for every file under `root`, skipping orchestrator internals.
+    Paths are absolutized once up front; per-entry checks are plain string compares and the
+    DirEntry is handed to callers so stat()/path never have to be recomputed.
+    """
+    root = os.path.abspath(root)
+    state_dir_abs = os.path.abspath(STATE_DIR)
+    prefix_len = len(os.path.join(root, ""))
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    # Skip orchestrator internals
+                    if entry.path != state_dir_abs:
+                        stack.append(entry.path)
+                elif entry.is_file():
+                    yield entry, entry.path[prefix_len:]
 
 def discover_files(root: str) -> List[str]:
-    files = []
-    for base, _, fns in os.walk(root):
-        # Skip orchestrator internals
-        if os.path.abspath(base).startswith(os.path.abspath(STATE_DIR)):
-            continue
-        for fn in fns:
-            full = os.path.join(base, fn)
-            files.append(os.path.relpath(full, WORKSPACE_ROOT))
-    return files
+    return [rel for _, rel in iter_workspace_files(root)]
 
 def is_package_dir(path: str) -> bool:
     return os.path.isdir(path) and any(f.endswith(".py") for f in os.listdir(path))
@@ -158,17 +300,36 @@ def ensure_init_py(package_dir: str, dry: bool) -> Optional[str]:
         return init_path
     return None
 
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 def load_json(path: str) -> Any:
-    return json.loads(retry_read(path))
+    return _json_loads(retry_read(path))
 
 def dump_json(path: str, obj: Any) -> None:
-    retry_write(path, json.dumps(obj, indent=2, ensure_ascii=False))
+    if orjson is not None:
+        try:
+            # Same layout as json.dump(indent=2, ensure_ascii=False), emitted as utf-8 bytes in C
+            data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass  # non-str keys / >64-bit ints: stdlib handles them
+        else:
+            _retry_open_write(path, lambda f: f.write(data), binary=True)
+            return
+    # Stream into the file handle; avoids holding the whole document as one str
+    _retry_open_write(path, lambda f: json.dump(obj, f, indent=2, ensure_ascii=False))
 
-def load_yaml_if_available(path: str) -> Optional[Any]:
+@functools.lru_cache(maxsize=None)
+def _optional_module(name: str) -> Optional[Any]:
+    # One import attempt per process; later calls skip the import lock and sys.modules probe
     try:
-        import yaml  # type: ignore
+        return importlib.import_module(name)
     except Exception:
         return None
+
+def load_yaml_if_available(path: str) -> Optional[Any]:
+    yaml = _optional_module("yaml")
+    if yaml is None:
+        return None
     text = retry_read(path)
     return yaml.safe_load(text)
 
@@ -196,43 +357,74 @@ def parse_story_file(path: str) -> Optional[Dict[str, Any]]:
             obj["_source_file"] = path
         return obj
 
-def env_fingerprint() -> Dict[str, Any]:
-    pyver = sys.version.split()[0]
+@functools.lru_cache(maxsize=1)
+def _os_python_key() -> Tuple[str, str]:
+    # platform.platform() may hit uname()/sw_vers; neither value changes within a process
+    return platform.platform(), sys.version.split()[0]
+
+@functools.lru_cache(maxsize=1)
+def _site_packages_dirs() -> Tuple[str, ...]:
     try:
-        code, out, _ = run_cmd("py -m pip list --format=json", cwd=WORKSPACE_ROOT, timeout=60)
-        libs = json.loads(out) if code == 0 and out.strip().startswith("[") else []
+        return tuple(site.getsitepackages())
     except Exception:
-        libs = []
+        return ()
+
+def _site_packages_key() -> Tuple[Tuple[str, Optional[int]], ...]:
+    # Installing/removing a distribution touches its site-packages dir mtime
+    key = []
+    for p in _site_packages_dirs():
+        try:
+            key.append((p, os.stat(p).st_mtime_ns))
+        except OSError:
+            key.append((p, None))
+    return tuple(key)
+
+@functools.lru_cache(maxsize=1)
+def _installed_libs(_site_key: Tuple[Tuple[str, Optional[int]], ...]) -> Dict[str, str]:
+    # In-process dist-info scan; replaces a 1-3 s `pip list` subprocess
+    try:
+        return {d.metadata["Name"]: d.version for d in distributions() if d.metadata["Name"]}
+    except Exception:
+        return {}
+
+def env_fingerprint() -> Dict[str, Any]:
+    os_name, pyver = _os_python_key()
     return {
-        "os": platform.platform(),
+        "os": os_name,
         "python": pyver,
-        "libs": {pkg["name"]: pkg["version"] for pkg in libs} if isinstance(libs, list) else {},
+        "libs": dict(_installed_libs(_site_packages_key())),
         "run_commands": RUN_COMMANDS,
     }
 
 def compute_artifacts_manifest() -> List[Dict[str, Any]]:
-    files = discover_files(WORKSPACE_ROOT)
     manifest = []
-    for rel in files:
-        abspath = os.path.join(WORKSPACE_ROOT, rel)
+    for entry, rel in iter_workspace_files(WORKSPACE_ROOT):
         try:
-            checksum = sha256_of_file(abspath)
+            checksum = sha256_of_file(entry.path)
         except Exception:
             checksum = "unreadable"
         manifest.append({"path": rel.replace("\\", "/"), "checksum": checksum, "last_story": None})
     return manifest
 
-def coverage_from_pytest_output(txt: str) -> Optional[float]:
-    # Look for percentages like "TOTAL xx%"; pytest-cov summary often shows "TOTAL   23     1    95%".
-    m = re.search(r"TOTAL\s+\d+\s+\d+\s+(\d+)%", txt)
+# pytest-cov summary: "TOTAL  23  1  95%", or with branch coverage "TOTAL  385  14  114  5  96%"
+_COV_RE = re.compile(r"TOTAL(?:[ \t]+\d+){2,4}[ \t]+(\d+(?:\.\d+)?)%")
+_COV_FALLBACK_RE = re.compile(r"(\d{1,3})%\s*Coverage", re.IGNORECASE)
+
+def _coverage_hit(txt: str) -> Optional[Tuple[str, float]]:
+    # ("total", pct) from the TOTAL row, else ("fallback", pct), else None
+    m = _COV_RE.search(txt)
     if m:
-        return float(m.group(1))
+        return "total", float(m.group(1))
     # Fallback: --cov-fail-under prints threshold fail; not reliable for exact %
-    m2 = re.search(r"(\d{1,3})%\s*Coverage", txt, re.IGNORECASE)
+    m2 = _COV_FALLBACK_RE.search(txt)
     if m2:
-        return float(m2.group(1))
+        return "fallback", float(m2.group(1))
     return None
 
+def coverage_from_pytest_output(txt: str) -> Optional[float]:
+    hit = _coverage_hit(txt)
+    return hit[1] if hit else None
+
 def sanitize_paths(paths: List[str]) -> List[str]:
     return [p.replace("\\", "/").lstrip("./") for p in paths]
 
@@ -246,9 +438,11 @@ def default_state() -> Dict[str, Any]:
         "environment_fingerprint": env_fingerprint(),
         "stories": [],
         "artifacts_manifest": [],
+        "artifact_stat": {},  # path -> [mtime_ns, size, sha256] of the last hash taken
+        "conftest_stamp": {},  # conftest path -> [mtime_ns, size] of its last clean compile
         "coverage_history": [],
         "protected_zone": {"paths": []},
-        "resume_token": str(uuid.uuid4()),
+        "resume_token": fast_uuid4_str(),
         "quarantine_tests": [],
         "container_fingerprint": None,
         "metrics": {"throughput": 0, "error_rate": 0},
@@ -278,43 +472,63 @@ def load_or_rebuild_state() -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[
 
     # Validate/add stories into state index
     state_ids = {s["id"]: s for s in state.get("stories", []) if "id" in s}
-    results = []
-    for s in stories:
-        sid = s.get("id")
-        if not sid:
-            continue
-        if sid not in state_ids:
-            results.append({"id": sid, "status": s.get("status", "ready"), "attempts": 0,
-                            "started_at": None, "completed_at": None,
-                            "assigned_role": s.get("assigned_role")})
-        else:
-            results.append(state_ids[sid])
-    state["stories"] = results
+    # Single sweep: reuse the persisted entry when known, else a fresh tracking record
+    state["stories"] = [
+        state_ids.get(sid) or {"id": sid, "status": s.get("status", "ready"), "attempts": 0,
+                               "started_at": None, "completed_at": None,
+                               "assigned_role": s.get("assigned_role")}
+        for s in stories
+        if (sid := s.get("id"))
+    ]
+    _index_state_stories(state)
+    _index_state_artifacts(state)
 
     # Protected zone assembly
     protected: Set[str] = set(sanitize_paths(state.get("protected_zone", {}).get("paths", [])))
     # Heuristic: any file previously touched by "done" stories + infra hints
+    done_ids = {st["id"] for st in state["stories"] if st.get("status") == "done"}
     for art in state.get("artifacts_manifest", []):
-        if art.get("last_story") and any(st["id"] == art["last_story"] and st.get("status") == "done" for st in state["stories"]):
+        ls = art.get("last_story")
+        if ls and ls in done_ids:
             protected.add(art["path"])
-    for hint in PROTECTED_INFRA_HINTS:
-        protected.add(hint.replace("\\", "/"))
+    protected.update(PROTECTED_INFRA_HINTS)  # already '/'-separated
     state["protected_zone"] = {"paths": sorted(protected)}
+    # Frozen lookup view for the executor; save_state drops it, the sorted list is what persists
+    state["_protected_set"] = frozenset(protected)
 
     # Check YAML availability if any .yml present
     yml_present = any(p.lower().endswith((".yml", ".yaml")) for p in story_paths)
-    missing_yaml = False
-    if yml_present:
-        try:
-            import yaml  # noqa: F401
-        except Exception:
-            missing_yaml = True
+    missing_yaml = yml_present and _optional_module("yaml") is None
 
     return state, stories, story_paths, (["pyyaml"] if missing_yaml else [])
 
+def _index_state_stories(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    # In-memory id -> entry view of state["stories"]; first entry wins, like the old linear scan
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for st in state["stories"]:
+        by_id.setdefault(st["id"], st)
+    state["_stories_by_id"] = by_id
+    return by_id
+
+def _index_state_artifacts(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    # In-memory path -> manifest entry view; first entry wins, like the old break-on-match scan
+    manifest = state.setdefault("artifacts_manifest", [])
+    if isinstance(manifest, dict):
+        # Columnar form written by app.orchestrator.state (version 2); rows are what we track
+        manifest = state["artifacts_manifest"] = [
+            {"path": p, "checksum": c, "last_story": None}
+            for p, c in zip(manifest.get("paths", []), manifest.get("checksums", []))
+        ]
+    by_path: Dict[str, Dict[str, Any]] = {}
+    for art in manifest:
+        by_path.setdefault(art["path"], art)
+    state["_artifacts_by_path"] = by_path
+    return by_path
+
 def save_state(state: Dict[str, Any]) -> None:
     state["last_updated"] = now_iso()
-    dump_json(STATE_PATH, state)
+    # "_"-prefixed keys are in-memory indexes rebuilt on load; never persist them
+    dump_json(STATE_PATH, {k: v for k, v in state.items() if not k.startswith("_")})
 
 def list_overrides() -> Dict[str, Dict[str, Any]]:
     overrides = {}
@@ -322,6 +536,9 @@ def list_overrides() -> Dict[str, Dict[str, Any]]:
         try:
             obj = load_json(p)
             if "story_id" in obj:
+                # Canonical form at ingestion: '/'-separated, no trailing '/', empties dropped
+                obj["allow_paths"] = [n for ap in obj.get("allow_paths", [])
+                                      if (n := ap.replace("\\", "/").rstrip("/"))]
                 overrides[obj["story_id"]] = obj
         except Exception:
             continue
@@ -336,12 +553,54 @@ def normalize_story(story: Dict[str, Any]) -> Dict[str, Any]:
     story.setdefault("dependencies", [])
     story.setdefault("status", "ready")
     story.setdefault("acceptance_criteria", [])
-    story.setdefault("allowed_paths", [])
+    story["allowed_paths"] = sanitize_paths(story.get("allowed_paths", []))
     story.setdefault("risk_level", "medium")
     return story
 
+def build_ready_index(state: Dict[str, Any], stories: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    One pass over the backlog: a heap of ready stories whose deps are all done, keyed by
+    (priority, backlog order), plus Kahn-style pending-dep counters so a later status change
+    only touches the successors of the story that moved (see ready_index_mark).
+    Relies on state["stories"] covering every backlog id, as load_or_rebuild_state ensures.
+    """
+    story_map = {s["id"]: normalize_story(s) for s in stories if s.get("id")}
+    status_map = {s["id"]: s.get("status", "ready") for s in state.get("stories", [])}
+    heap: List[Tuple[int, int, str]] = []
+    waiting: Dict[str, Tuple[int, int, str]] = {}
+    pending: Dict[str, int] = {}
+    dependents: Dict[str, List[str]] = {}
+    for order, (sid, s) in enumerate(story_map.items()):
+        if status_map.get(sid, s.get("status")) != "ready":
+            continue
+        key = (int(s.get("priority", 99)), order, sid)
+        blockers = {d for d in s.get("dependencies", []) if status_map.get(d, "done") != "done"}
+        if not blockers:
+            heap.append(key)
+            continue
+        waiting[sid] = key
+        pending[sid] = len(blockers)
+        for d in blockers:
+            dependents.setdefault(d, []).append(sid)
+    heapq.heapify(heap)
+    return {"heap": heap, "waiting": waiting, "pending": pending, "dependents": dependents,
+            "story_map": story_map}
+
+def ready_index_mark(index: Dict[str, Any], story_id: str, status: str) -> None:
+    # Only a transition to done can unblock anything; push successors whose last blocker cleared
+    if status != "done":
+        return
+    for succ in index["dependents"].pop(story_id, ()):
+        index["pending"][succ] -= 1
+        if index["pending"][succ] == 0:
+            heapq.heappush(index["heap"], index["waiting"].pop(succ))
+
+def ready_index_peek(index: Dict[str, Any], n: int) -> List[str]:
+    return [sid for _, _, sid in heapq.nsmallest(n, index["heap"])]
+
 def pick_next_story(state: Dict[str, Any], stories: List[Dict[str, Any]], overrides: Dict[str, Any],
-                    fix_gate_needed: bool) -> Optional[Tuple[Dict[str, Any], str]]:
+                    fix_gate_needed: bool, ready_index: Optional[Dict[str, Any]] = None
+                    ) -> Optional[Tuple[Dict[str, Any], str]]:
     # If Fix-Gate needed, synthesize virtual story that allows only safe infra ops (like adding __init__.py)
     if fix_gate_needed:
         v = {
@@ -360,32 +619,22 @@ def pick_next_story(state: Dict[str, Any], stories: List[Dict[str, Any]], overri
             "assigned_role": "QA Engineer/Tester",
         }
         return v, "fix-gate"
-    # Otherwise choose highest-priority ready with deps satisfied
-    story_map = {s["id"]: normalize_story(s) for s in stories if s.get("id")}
-    status_map = {s["id"]: s.get("status", "ready") for s in state.get("stories", [])}
-    # Compute satisfiable set
-    ready = []
-    for sid, s in story_map.items():
-        if status_map.get(sid, s.get("status")) != "ready":
-            continue
-        deps = s.get("dependencies", [])
-        if all(status_map.get(d, "done") == "done" for d in deps):
-            ready.append(s)
-    if not ready:
+    # Otherwise choose highest-priority ready with deps satisfied (pops it from the index)
+    index = ready_index if ready_index is not None else build_ready_index(state, stories)
+    if not index["heap"]:
         return None
-    ready.sort(key=lambda x: int(x.get("priority", 99)))
-    chosen = ready[0]
-    return chosen, "priority"
+    _, _, sid = heapq.heappop(index["heap"])
+    return index["story_map"][sid], "priority"
 
 def mark_state_story(state: Dict[str, Any], story_id: str, status: str, assigned_role: Optional[str] = None, inc_attempts: bool=False):
-    found = None
-    for s in state["stories"]:
-        if s["id"] == story_id:
-            found = s
-            break
+    by_id = state.get("_stories_by_id")
+    if by_id is None:
+        by_id = _index_state_stories(state)
+    found = by_id.get(story_id)
     if not found:
         found = {"id": story_id, "status": status, "attempts": 0, "started_at": None, "completed_at": None, "assigned_role": assigned_role}
         state["stories"].append(found)
+        by_id[story_id] = found
     found["status"] = status
     if inc_attempts:
         found["attempts"] = found.get("attempts", 0) + 1
@@ -396,7 +645,95 @@ def mark_state_story(state: Dict[str, Any], story_id: str, status: str, assigned
     if assigned_role:
         found["assigned_role"] = assigned_role
 
-def preflight_checks() -> Dict[str, Any]:
+def _router_file_ok(entry: os.DirEntry, attempts: int = 3, delay: float = 0.25) -> bool:
+    # Retries transient OneDrive/AV locks like retry_read; a file still unreadable after that
+    # is reported as failing the check rather than crashing the preflight pool
+    for i in range(attempts):
+        try:
+            with open(entry.path, "rb") as f:
+                # An empty module can't define a router (and mmap rejects zero-length files)
+                if os.fstat(f.fileno()).st_size == 0:
+                    return False
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return _ROUTER_PAT.search(mm) is not None
+        except FileNotFoundError:
+            return True  # removed since the directory listing: nothing left to check
+        except OSError:
+            if i == attempts - 1:
+                return False
+            time.sleep(delay)
+    return False
+
+# Each preflight subcheck returns (ok, notes); they share no state, so they can run concurrently
+def _pf_import_app() -> Tuple[bool, List[str]]:
+    sys.path.insert(0, WORKSPACE_ROOT)
+    try:
+        __import__("app")
+        return True, []
+    except Exception as e:
+        return False, [f"import app failed: {e!r}"]
+
+def _pf_packages(pkg_dirs: Optional[List[PkgDir]] = None) -> Tuple[bool, List[str]]:
+    # dirs with .py missing __init__.py; only app/ counts here, the shared walk also covers tests
+    if pkg_dirs is None:
+        pkg_dirs = _enumerate_py_package_dirs(["app"])
+    missing_init = [rel for rel, has_py, has_init in pkg_dirs
+                    if has_py and not has_init and (rel == "app" or rel.startswith("app/"))]
+    return not missing_init, ([f"Missing __init__.py in: {missing_init}"] if missing_init else [])
+
+def _pf_conftest(conftest_stamp: Optional[Dict[str, List[int]]] = None) -> Tuple[bool, List[str]]:
+    # `conftest_stamp` (state["conftest_stamp"]) skips the compile while unchanged; updated in place
+    conf_path = os.path.join(WORKSPACE_ROOT, "test", "conftest.py")
+    if not os.path.exists(conf_path):
+        conf_path = os.path.join(WORKSPACE_ROOT, "tests", "conftest.py")
+    try:
+        st = os.stat(conf_path)
+    except OSError:
+        return True, []  # not present is fine
+    stamps = {} if conftest_stamp is None else conftest_stamp
+    stamp = [st.st_mtime_ns, st.st_size]
+    try:
+        # Avoid executing app side-effects; just compile file (skipped when unchanged since last success)
+        if stamps.get(conf_path) != stamp:
+            compile(retry_read(conf_path), conf_path, "exec")
+            stamps[conf_path] = stamp
+        return True, []
+    except Exception as e:
+        stamps.pop(conf_path, None)
+        return False, [f"conftest issues: {e!r}"]
+
+def _pf_env() -> Tuple[bool, List[str]]:
+    missing_env = [k for k in ENV_VARS_AVAILABLE if not os.environ.get(k)]
+    return not missing_env, ([f"Missing env vars: {missing_env}"] if missing_env else [])
+
+def _pf_routers() -> Tuple[bool, List[str]]:
+    # Router imports superficially consistent
+    routers_dir = os.path.join(WORKSPACE_ROOT, "app", "routers")
+    if not os.path.isdir(routers_dir):
+        return True, []
+    bad = []
+    with os.scandir(routers_dir) as it:
+        for entry in it:
+            if entry.name.endswith(".py") and not _router_file_ok(entry):
+                bad.append(entry.name)
+    return not bad, ([f"Routers missing `router` variable or APIRouter: {bad}"] if bad else [])
+
+# Result key per subcheck, in the order their notes are reported
+_PREFLIGHT_SUBCHECKS: List[Tuple[str, Callable[[], Tuple[bool, List[str]]]]] = [
+    ("import_app", _pf_import_app),
+    ("packages_discoverable", _pf_packages),
+    ("tests_import_conftest", _pf_conftest),
+    ("env_vars_present", _pf_env),
+    ("router_imports_consistent", _pf_routers),
+]
+
+def preflight_checks(pkg_dirs: Optional[List[PkgDir]] = None,
+                     conftest_stamp: Optional[Dict[str, List[int]]] = None) -> Dict[str, Any]:
+    """
+    Run the preflight subchecks once. main() reuses the result for the whole tick (the executor
+    is handed it), and `pkg_dirs` is that tick's _enumerate_py_package_dirs(_FIX_GATE_ROOTS).
+    `conftest_stamp` is state["conftest_stamp"], so an unchanged conftest.py is not recompiled.
+    """
     results = {
         "import_app": None,
         "packages_discoverable": None,
@@ -409,119 +746,152 @@ def preflight_checks() -> Dict[str, Any]:
         "sec_compliance_checklist": True,
         "notes": [],
     }
-    # 1) import app
-    sys.path.insert(0, WORKSPACE_ROOT)
-    try:
-        __import__("app")
-        results["import_app"] = True
-    except Exception as e:
-        results["import_app"] = False
-        results["notes"].append(f"import app failed: {e!r}")
-
-    # 2) packages discoverable — check for dirs with .py missing __init__.py
-    missing_init = []
-    for base, dirs, files in os.walk(os.path.join(WORKSPACE_ROOT, "app")):
-        if any(fn.endswith(".py") for fn in files):
-            init_path = os.path.join(base, "__init__.py")
-            if not os.path.exists(init_path):
-                missing_init.append(os.path.relpath(base, WORKSPACE_ROOT))
-    results["packages_discoverable"] = (len(missing_init) == 0)
-    if missing_init:
-        results["notes"].append(f"Missing __init__.py in: {missing_init}")
-
-    # 3) tests/conftest import
-    conf_path = os.path.join(WORKSPACE_ROOT, "test", "conftest.py")
-    if not os.path.exists(conf_path):
-        conf_path = os.path.join(WORKSPACE_ROOT, "tests", "conftest.py")
-    if os.path.exists(conf_path):
-        try:
-            # Avoid executing app side-effects; just compile file
-            compile(retry_read(conf_path), conf_path, "exec")
-            results["tests_import_conftest"] = True
-        except Exception as e:
-            results["tests_import_conftest"] = False
-            results["notes"].append(f"conftest issues: {e!r}")
-    else:
-        results["tests_import_conftest"] = True  # not present is fine
+    # The app import (CPU + import lock) overlaps the filesystem walks/reads of the others
+    with ThreadPoolExecutor(max_workers=len(_PREFLIGHT_SUBCHECKS)) as ex:
+        extra_args = {_pf_packages: (pkg_dirs,), _pf_conftest: (conftest_stamp,)}
+        futures = [(key, ex.submit(fn, *extra_args.get(fn, ()))) for key, fn in _PREFLIGHT_SUBCHECKS]
+        for key, fut in futures:
+            ok, notes = fut.result()
+            results[key] = ok
+            results["notes"].extend(notes)
+    return results
 
-    # 4) ENV vars present
-    missing_env = [k for k in ENV_VARS_AVAILABLE if not os.environ.get(k)]
-    results["env_vars_present"] = (len(missing_env) == 0)
-    if missing_env:
-        results["notes"].append(f"Missing env vars: {missing_env}")
+_PYTHON_LAUNCHERS = frozenset({"py", "py.exe", "python", "python.exe", "python3"})
+# Variables pytest/coverage/the interpreter actually consult; everything else is dropped from the child env
+_PYTEST_ENV_KEYS = ("PATH", "PATHEXT", "SYSTEMROOT", "SystemRoot", "COMSPEC", "TEMP", "TMP", "TMPDIR",
+                    "HOME", "USERPROFILE", "APPDATA", "LOCALAPPDATA", "LANG", "VIRTUAL_ENV", "CONDA_PREFIX")
+_PYTEST_ENV_PREFIXES = ("PYTHON", "PYTEST", "COV", "LC_")
 
-    # 5) Router imports superficially consistent
-    routers_dir = os.path.join(WORKSPACE_ROOT, "app", "routers")
-    if os.path.isdir(routers_dir):
-        bad = []
-        for fn in os.listdir(routers_dir):
-            if fn.endswith(".py"):
-                content = retry_read(os.path.join(routers_dir, fn))
-                if "router =" not in content and "APIRouter(" not in content:
-                    bad.append(fn)
-        results["router_imports_consistent"] = (len(bad) == 0)
-        if bad:
-            results["notes"].append(f"Routers missing `router` variable or APIRouter: {bad}")
-    else:
-        results["router_imports_consistent"] = True
+@functools.lru_cache(maxsize=8)
+def _pytest_argv(cmd: str) -> Tuple[str, ...]:
+    # "py -m pytest ..." → this interpreter's absolute path: no PATH lookup, no launcher hop
+    args = _split_cmd(cmd)
+    if args and os.path.basename(args[0]).lower() in _PYTHON_LAUNCHERS:
+        args[0] = sys.executable
+    return tuple(args)
 
-    return results
+def _pytest_env() -> Dict[str, str]:
+    keep = set(_PYTEST_ENV_KEYS).union(ENV_VARS_AVAILABLE)
+    return {k: v for k, v in os.environ.items() if k in keep or k.startswith(_PYTEST_ENV_PREFIXES)}
 
 def run_pytest_and_coverage() -> Tuple[bool, float, str]:
-    cmd = RUN_COMMANDS[0]
-    code, out, err = run_cmd(cmd, cwd=WORKSPACE_ROOT)
-    output = out + "\n" + err
-    cov = coverage_from_pytest_output(output) or 0.0
+    cmd = list(_pytest_argv(RUN_COMMANDS[0]))
+    # Match the summary as lines stream past; first TOTAL wins, else the first fallback hit
+    hits: Dict[str, float] = {}
+    def _probe(line: str) -> None:
+        if "total" in hits:
+            return
+        hit = _coverage_hit(line)
+        if hit:
+            hits.setdefault(*hit)
+    code, output, _ = run_cmd_tail(cmd, cwd=WORKSPACE_ROOT, on_line=_probe, env=_pytest_env())
+    cov = hits.get("total", hits.get("fallback", 0.0))
     ok = (code == 0) and (cov >= COVERAGE_TARGET - 1e-6)
     return ok, cov, output
 
-def derive_allowed_for_fix_gate() -> List[str]:
+_FIX_GATE_ROOTS = ["app", "tests", "test"]
+
+def _enumerate_py_package_dirs(roots: List[str]) -> List[PkgDir]:
+    """
+    Single scandir traversal of each existing WORKSPACE_ROOT-relative root.
+    Returns sorted (dir_relpath, has_py, has_init) for every directory; relpaths use '/'.
+    Dirent type info means no per-file stat, unlike os.walk + os.path.exists.
+    """
+    prefix_len = len(os.path.join(WORKSPACE_ROOT, ""))
+    out: List[PkgDir] = []
+    for rel_root in roots:
+        stack = [os.path.join(WORKSPACE_ROOT, rel_root)]
+        while stack:
+            d = stack.pop()
+            try:
+                it = os.scandir(d)
+            except OSError:
+                continue
+            has_py = has_init = False
+            with it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".py"):
+                        has_py = True
+                        has_init = has_init or entry.name == "__init__.py"
+            out.append((d[prefix_len:].replace("\\", "/"), has_py, has_init))
+    out.sort()
+    return out
+
+def derive_allowed_for_fix_gate(pkg_dirs: Optional[List[PkgDir]] = None) -> List[str]:
     # For fix gate we allow ONLY adding __init__.py to python package dirs under app/ and tests/
-    allowed = []
-    for base in [os.path.join(WORKSPACE_ROOT, "app"), os.path.join(WORKSPACE_ROOT, "tests"), os.path.join(WORKSPACE_ROOT, "test")]:
-        if os.path.isdir(base):
-            for root, dirs, files in os.walk(base):
-                if any(f.endswith(".py") for f in files):
-                    allowed.append(os.path.relpath(root, WORKSPACE_ROOT).replace("\\", "/") + "/__init__.py")
-    return sorted(set(allowed))
-
-def apply_minimal_plan_for_fix_gate(dry: bool) -> List[str]:
+    if pkg_dirs is None:
+        pkg_dirs = _enumerate_py_package_dirs(_FIX_GATE_ROOTS)
+    return sorted({rel + "/__init__.py" for rel, has_py, _ in pkg_dirs if has_py})
+
+def apply_minimal_plan_for_fix_gate(dry: bool, pkg_dirs: Optional[List[PkgDir]] = None) -> List[str]:
+    if pkg_dirs is None:
+        pkg_dirs = _enumerate_py_package_dirs(_FIX_GATE_ROOTS)
     touched = []
-    for base in [os.path.join(WORKSPACE_ROOT, "app"),
-                 os.path.join(WORKSPACE_ROOT, "tests"),
-                 os.path.join(WORKSPACE_ROOT, "test")]:
-        if os.path.isdir(base):
-            for root, dirs, files in os.walk(base):
-                if any(f.endswith(".py") for f in files):
-                    maybe = ensure_init_py(root, dry)
-                    if maybe:
-                        touched.append(os.path.relpath(maybe, WORKSPACE_ROOT).replace("\\", "/"))
+    for rel, has_py, has_init in pkg_dirs:
+        if has_py and not has_init:
+            if ensure_init_py(os.path.join(WORKSPACE_ROOT, rel), dry):
+                touched.append(rel + "/__init__.py")
     return touched
 
-def within_allowed_paths(path: str, allowed: List[str], overrides: Dict[str, Any]) -> bool:
+OVERRIDE_WILDCARD = "*"  # story_id of an override that applies to every story
+
+def _compile_override_index(overrides: Dict[str, Any], story_id: Optional[str] = None) -> FrozenSet[str]:
+    """
+    Flatten override allow_paths (already canonical from list_overrides) into one set.
+    With `story_id`, only that story's override plus the wildcard one count.
+    Membership of a path or any of its ancestors then answers the override check.
+    """
+    if story_id is None:
+        sources = overrides.values()
+    else:
+        sources = [overrides[k] for k in (story_id, OVERRIDE_WILDCARD) if k in overrides]
+    return frozenset(ap for ov in sources for ap in ov.get("allow_paths", []))
+
+def _override_allows(path: str, index: FrozenSet[str]) -> bool:
+    # Probe the path and each enclosing directory: O(depth) set lookups instead of O(O*P) scans
+    if not index:
+        return False
+    if path in index:
+        return True
+    i = path.rfind("/")
+    while i > 0:
+        if path[:i] in index:
+            return True
+        i = path.rfind("/", 0, i)
+    return False
+
+def within_allowed_paths(path: str, allowed: List[str], overrides: Dict[str, Any],
+                         index: Optional[FrozenSet[str]] = None) -> bool:
     path = path.replace("\\", "/")
     if path in allowed:
         return True
     # Also allow if an override grants the enclosing path
-    for ov in overrides.values():
-        for p in ov.get("allow_paths", []):
-            p = p.replace("\\", "/")
-            if path == p or path.startswith(p.rstrip("/") + "/"):
-                return True
-    return False
+    return _override_allows(path, _compile_override_index(overrides) if index is None else index)
 
 def executor_for_story(story: Dict[str, Any], dry: bool, overrides: Dict[str, Any],
-                       protected: Set[str]) -> Dict[str, Any]:
+                       protected: FrozenSet[str], *, preflight: Optional[Dict[str, Any]] = None,
+                       pytest_result: Optional[Tuple[bool, float, str]] = None,
+                       pytest_ran: bool = True,
+                       artifact_stat: Optional[Dict[str, List[Any]]] = None,
+                       pkg_dirs: Optional[List[PkgDir]] = None) -> Dict[str, Any]:
     """
     Executes a single story with minimal, safe edits.
     Returns EXECUTOR OUTPUT dict to be used in final print.
+    `preflight` / `pytest_result` let main() hand over results it already computed this tick;
+    pytest is re-run only when the executor actually wrote files (never on dry runs).
+    `pytest_ran=False` marks `pytest_result` as a stand-in for a pytest run main() skipped;
+    when it is reused the testing report says ran=False.
+    `artifact_stat` (state["artifact_stat"]) lets unchanged files skip re-hashing; updated in place.
+    `pkg_dirs` is main()'s package-dir walk for this tick, shared by the Fix-Gate derive/apply.
     """
     sid = story["id"]
     risk = story.get("risk_level", "medium")
-    allowed = sanitize_paths(story.get("allowed_paths", []))
+    allowed = story.get("allowed_paths", [])  # sanitized by normalize_story at selection
 
     # PRE-FLIGHT RESULTS
-    pre = preflight_checks()
+    pre = preflight if preflight is not None else preflight_checks()
 
     # Determine change plan
     minimal_plan = []
@@ -529,10 +899,12 @@ def executor_for_story(story: Dict[str, Any], dry: bool, overrides: Dict[str, An
 
     if sid == "fix_gate_imports_tests":
         # Only allow adding __init__.py in discovered package dirs
-        derived = derive_allowed_for_fix_gate()
+        if pkg_dirs is None:
+            pkg_dirs = _enumerate_py_package_dirs(_FIX_GATE_ROOTS)
+        derived = derive_allowed_for_fix_gate(pkg_dirs)
         minimal_plan.append("Add missing __init__.py files to Python package directories under app/, tests/, test/")
         # Apply
-        files = apply_minimal_plan_for_fix_gate(dry)
+        files = apply_minimal_plan_for_fix_gate(dry, pkg_dirs)
         # Filter to derived allowed (safety)
         files = [f for f in files if f in derived]
         touched_files.extend(files)
@@ -540,14 +912,12 @@ def executor_for_story(story: Dict[str, Any], dry: bool, overrides: Dict[str, An
     else:
         # For normal stories, we only touch files explicitly allowed or via override
         # This reference executor does not attempt complex refactors; it will stop if a required path is protected or not allowed.
-        for p in allowed:
+        override_index = _compile_override_index(overrides, sid)
+        for pp in allowed:
             # Ensure we don't hit protected without override
-            pp = p.replace("\\", "/")
             if pp in protected:
                 # unless explicit override exists
-                ok_by_override = any(pp == ap.replace("\\", "/") or pp.startswith(ap.replace("\\", "/").rstrip("/") + "/")
-                                     for ov in overrides.values() for ap in ov.get("allow_paths", []))
-                if not ok_by_override:
+                if not _override_allows(pp, override_index):
                     return {
                         "summary": "Edit requires touching a protected path without override.",
                         "preflight": pre,
@@ -555,7 +925,7 @@ def executor_for_story(story: Dict[str, Any], dry: bool, overrides: Dict[str, An
                         "testing_report": {"ran": False, "ok": False, "quarantined": []},
                         "verification": {"coverage_ok": False, "coverage": 0.0, "tests_ok": False},
                         "security_compliance": {"result": "N-A", "notes": ["No edits performed"]},
-                        "checkpoint": {"touched": [], "checksums": {}, "coverage_delta": 0.0, "resume_token": str(uuid.uuid4())},
+                        "checkpoint": {"touched": [], "checksums": {}, "coverage_delta": 0.0, "resume_token": fast_uuid4_str()},
                         "risk_rollback": "No changes applied.",
                         "assumptions": ["Story requires explicit override to touch protected files."],
                         "metrics_update": {"throughput": 0, "error_rate": 1},
@@ -565,32 +935,36 @@ def executor_for_story(story: Dict[str, Any], dry: bool, overrides: Dict[str, An
         # Minimal executor: verify allowed paths exist; if a path endswith __init__.py and missing, create it
         for p in allowed:
             abs_p = os.path.join(WORKSPACE_ROOT, p)
-            if p.endswith("/__init__.py") or p.endswith("\\__init__.py") or os.path.basename(p) == "__init__.py":
+            # Paths are '/'-normalized at ingestion, so a plain suffix test is exact
+            if p == "__init__.py" or p.endswith("/__init__.py"):
                 dirp = os.path.dirname(abs_p)
                 if os.path.isdir(dirp) and not os.path.exists(abs_p):
                     if not dry:
                         retry_write(abs_p, "# auto-created per story allowed_paths\n")
-                    touched_files.append(p.replace("\\", "/"))
+                    touched_files.append(p)
 
     # TESTING & VERIFICATION
-    tests_ok, cov, test_output = run_pytest_and_coverage()
+    # Dry runs only report would-be edits, so the tree pytest saw in main() is unchanged
+    need_retest = bool(touched_files) and not dry
+    if pytest_result is not None and not need_retest:
+        tests_ok, cov, test_output = pytest_result
+        ran = pytest_ran
+    else:
+        tests_ok, cov, test_output = run_pytest_and_coverage()
+        ran = True
     coverage_ok = cov >= COVERAGE_TARGET - 1e-6
 
     # Build checksum map
-    checksums = {}
-    for f in touched_files:
-        ap = os.path.join(WORKSPACE_ROOT, f)
-        if os.path.exists(ap):
-            checksums[f] = sha256_of_file(ap)
+    checksums = checksums_with_stat_cache(touched_files, {} if artifact_stat is None else artifact_stat)
 
     return {
         "summary": f"Touched {len(touched_files)} files. Fix-Gate={sid=='fix_gate_imports_tests'}",
         "preflight": pre,
         "change_set": {"plan": minimal_plan, "files": touched_files},
-        "testing_report": {"ran": True, "ok": tests_ok, "quarantined": []},
+        "testing_report": {"ran": ran, "ok": tests_ok, "quarantined": []},
         "verification": {"coverage_ok": coverage_ok, "coverage": cov, "tests_ok": tests_ok},
         "security_compliance": {"result": "pass", "notes": ["No PII added; no RBAC/audit/export-control changes."]},
-        "checkpoint": {"touched": touched_files, "checksums": checksums, "coverage_delta": 0.0, "resume_token": str(uuid.uuid4())},
+        "checkpoint": {"touched": touched_files, "checksums": checksums, "coverage_delta": 0.0, "resume_token": fast_uuid4_str()},
         "risk_rollback": "Minimal changes; revert by restoring touched files from checksum list.",
         "assumptions": ["Executor makes minimal edits. Complex refactors require explicit allowed_paths and/or overrides."],
         "metrics_update": {"throughput": 1 if tests_ok and coverage_ok else 0, "error_rate": 0 if tests_ok else 1},
@@ -611,67 +985,139 @@ def print_strict_output(
     batch_complete: bool,
     release_notes: Optional[List[str]]
 ):
+    # Collect every line, scrub and write once: one stdout write/flush instead of one per line
+    buf: List[str] = []
+    emit = buf.append
+
     # EXECUTIVE SUMMARY
-    safe_print("EXECUTIVE SUMMARY:")
-    safe_print(f"- Status + Next Actions (one short paragraph)\n{status_next}\n")
+    emit("EXECUTIVE SUMMARY:")
+    emit(f"- Status + Next Actions (one short paragraph)\n{status_next}\n")
 
     # BLOCKING ISSUES
-    safe_print("BLOCKING ISSUES:")
+    emit("BLOCKING ISSUES:")
     if blocking_issues:
         for bi in blocking_issues:
-            safe_print(f"- id={bi.get('id','?')}, code={bi.get('code')}, action={bi.get('action')}")
+            emit(f"- id={bi.get('id','?')}, code={bi.get('code')}, action={bi.get('action')}")
     else:
-        safe_print("- None")
+        emit("- None")
 
     # PROGRESS METRICS
-    safe_print("\nPROGRESS METRICS:")
-    safe_print(f"- Stories: done={progress_metrics['stories']['done']} / in_progress={progress_metrics['stories']['in_progress']} / ready={progress_metrics['stories']['ready']} / blocked={progress_metrics['stories']['blocked']}")
-    safe_print(f"- Coverage: current %={progress_metrics['coverage']['current']} , delta={progress_metrics['coverage']['delta']} , top5={progress_metrics['coverage']['top5']}")
-    safe_print(f"- Throughput (stories/hour)={progress_metrics['throughput']} , error_rate={progress_metrics['error_rate']}")
+    emit("\nPROGRESS METRICS:")
+    emit(f"- Stories: done={progress_metrics['stories']['done']} / in_progress={progress_metrics['stories']['in_progress']} / ready={progress_metrics['stories']['ready']} / blocked={progress_metrics['stories']['blocked']}")
+    emit(f"- Coverage: current %={progress_metrics['coverage']['current']} , delta={progress_metrics['coverage']['delta']} , top5={progress_metrics['coverage']['top5']}")
+    emit(f"- Throughput (stories/hour)={progress_metrics['throughput']} , error_rate={progress_metrics['error_rate']}")
 
     # DETAILED LOGS
-    safe_print("\nDETAILED LOGS:")
+    emit("\nDETAILED LOGS:")
     for line in detailed_logs:
-        safe_print(f"- {line}")
+        emit(f"- {line}")
 
     # ORCHESTRATOR OUTPUT
-    safe_print("\nORCHESTRATOR OUTPUT:")
-    safe_print(f"- Progress Snapshot: {orchestrator_output['progress_snapshot']}")
-    safe_print(f"- Selected Work Item: {orchestrator_output.get('selected')}")
-    safe_print(f"- Protected Zone summary: count={len(orchestrator_output['protected_zone'])} key_paths={list(orchestrator_output['protected_zone'])[:5]}")
-    safe_print(f"- State Delta + resume_token: {orchestrator_output['state_delta']} / {orchestrator_output['resume_token']}")
-    safe_print(f"- Next ready candidates: {orchestrator_output['next_ready']}")
+    emit("\nORCHESTRATOR OUTPUT:")
+    emit(f"- Progress Snapshot: {orchestrator_output['progress_snapshot']}")
+    emit(f"- Selected Work Item: {orchestrator_output.get('selected')}")
+    emit(f"- Protected Zone summary: count={len(orchestrator_output['protected_zone'])} key_paths={list(orchestrator_output['protected_zone'])[:5]}")
+    emit(f"- State Delta + resume_token: {orchestrator_output['state_delta']} / {orchestrator_output['resume_token']}")
+    emit(f"- Next ready candidates: {orchestrator_output['next_ready']}")
 
     # EXECUTOR OUTPUT
-    safe_print("\nEXECUTOR OUTPUT (for the processed item):")
+    emit("\nEXECUTOR OUTPUT (for the processed item):")
     if executor_output:
-        safe_print(f"- Summary: {executor_output['summary']}")
+        emit(f"- Summary: {executor_output['summary']}")
         pf = executor_output["preflight"]
-        safe_print(f"- Pre-Flight Results: import_app={pf['import_app']} packages_discoverable={pf['packages_discoverable']} tests_import_conftest={pf['tests_import_conftest']} env_ok={pf['env_vars_present']} router_ok={pf['router_imports_consistent']} coverage_feasible={pf['coverage_feasible']} windows_specifics={pf['windows_specifics']} paths_respected={pf['paths_respected']} sec_checklist={pf['sec_compliance_checklist']} notes={pf['notes']}")
-        safe_print(f"- Change Set: plan={executor_output['change_set']['plan']} files={executor_output['change_set']['files']}")
+        emit(f"- Pre-Flight Results: import_app={pf['import_app']} packages_discoverable={pf['packages_discoverable']} tests_import_conftest={pf['tests_import_conftest']} env_ok={pf['env_vars_present']} router_ok={pf['router_imports_consistent']} coverage_feasible={pf['coverage_feasible']} windows_specifics={pf['windows_specifics']} paths_respected={pf['paths_respected']} sec_checklist={pf['sec_compliance_checklist']} notes={pf['notes']}")
+        emit(f"- Change Set: plan={executor_output['change_set']['plan']} files={executor_output['change_set']['files']}")
         tst = executor_output["testing_report"]
-        safe_print(f"- Testing Report: ran={tst['ran']} ok={tst['ok']} quarantined={tst['quarantined']}")
+        emit(f"- Testing Report: ran={tst['ran']} ok={tst['ok']} quarantined={tst['quarantined']}")
         ver = executor_output["verification"]
-        safe_print(f"- Verification: RUN_COMMANDS executed; coverage_ok={ver['coverage_ok']} coverage={ver['coverage']} tests_ok={ver['tests_ok']}")
+        ran_note = "RUN_COMMANDS executed" if tst["ran"] else "RUN_COMMANDS not run (pytest skipped)"
+        emit(f"- Verification: {ran_note}; coverage_ok={ver['coverage_ok']} coverage={ver['coverage']} tests_ok={ver['tests_ok']}")
         sc = executor_output["security_compliance"]
-        safe_print(f"- Security/Compliance Result: {sc['result']} notes={sc['notes']}")
+        emit(f"- Security/Compliance Result: {sc['result']} notes={sc['notes']}")
         chk = executor_output["checkpoint"]
-        safe_print(f"- Checkpoint Payload: touched={chk['touched']} checksums={chk['checksums']} coverage_delta={chk['coverage_delta']} updated_resume_token={chk['resume_token']}")
-        safe_print(f"- Risk & Rollback: {executor_output['risk_rollback']}")
-        safe_print(f"- Assumptions Ledger: {executor_output['assumptions']}")
-        safe_print(f"- Metrics Update: {executor_output['metrics_update']}")
+        emit(f"- Checkpoint Payload: touched={chk['touched']} checksums={chk['checksums']} coverage_delta={chk['coverage_delta']} updated_resume_token={chk['resume_token']}")
+        emit(f"- Risk & Rollback: {executor_output['risk_rollback']}")
+        emit(f"- Assumptions Ledger: {executor_output['assumptions']}")
+        emit(f"- Metrics Update: {executor_output['metrics_update']}")
     else:
-        safe_print("- No executor action performed this run.")
+        emit("- No executor action performed this run.")
 
     # BATCH COMPLETE
     if batch_complete:
-        safe_print("\nBUILD_COMPLETE")
-        safe_print("RELEASE NOTES:")
+        emit("\nBUILD_COMPLETE")
+        emit("RELEASE NOTES:")
         if release_notes:
             for r in release_notes:
-                safe_print(f"- {r}")
+                emit(f"- {r}")
         else:
-            safe_print("- No changes.")
+            emit("- No changes.")
+
+    sys.stdout.write("\n".join(map(scrub_pii, buf)) + "\n")
+    sys.stdout.flush()
+
+TICK_CACHE_FILENAME = "tick_cache.json"
+_TICK_CACHE_VERSION = 1
+# Tool/run by-products that change every tick without changing what the orchestrator would do
+_FINGERPRINT_SKIP = frozenset({"__pycache__", ".pytest_cache", ".mypy_cache", ".git", ".orchestrator"})
+
+def _tick_cache_path() -> str:
+    return os.path.join(STATE_DIR, TICK_CACHE_FILENAME)
+
+def _workspace_fingerprint(mode: str) -> str:
+    """
+    sha256 over everything a tick's outcome depends on: file (path, mtime_ns, size) for the
+    workspace tree minus run by-products, the state file and overrides, env vars, interpreter,
+    installed packages and this script itself. One scandir walk; no file contents are read.
+    """
+    h = hashlib.sha256()
+    h.update(repr((mode, RUN_COMMANDS, COVERAGE_TARGET, sys.executable, _site_packages_key(),
+                   tuple(os.environ.get(k, "") for k in ENV_VARS_AVAILABLE))).encode())
+    for extra in (os.path.abspath(__file__), STATE_PATH):
+        try:
+            st = os.stat(extra)
+            h.update(f"{extra}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+        except OSError:
+            h.update(f"{extra}\0-\n".encode())
+    try:
+        with os.scandir(OVERRIDES_DIR) as it:
+            for e in sorted(it, key=lambda e: e.name):
+                try:
+                    st = e.stat()
+                    h.update(f"ov/{e.name}\0{st.st_mtime_ns}\0{st.st_size}\n".encode())
+                except OSError:
+                    h.update(f"ov/{e.name}\0-\n".encode())
+    except OSError:
+        pass
+    stamps = []
+    for entry, rel in iter_workspace_files(WORKSPACE_ROOT):
+        parts = rel.replace("\\", "/").split("/")
+        if _FINGERPRINT_SKIP.intersection(parts[:-1]) or parts[-1].startswith(".coverage"):
+            continue
+        try:
+            st = entry.stat()
+        except OSError:
+            # Gone since scandir listed it: still a change, and the tick must go on
+            stamps.append(f"{rel}\0-\n")
+            continue
+        stamps.append(f"{rel}\0{st.st_mtime_ns}\0{st.st_size}\n")
+    stamps.sort()
+    h.update("".join(stamps).encode())
+    return h.hexdigest()
+
+def _load_tick_cache() -> Optional[Dict[str, Any]]:
+    try:
+        data = load_json(_tick_cache_path())
+    except Exception:
+        return None
+    if not isinstance(data, dict) or data.get("version") != _TICK_CACHE_VERSION:
+        return None
+    return data
+
+def _save_tick_cache(fingerprint: str, report: Dict[str, Any]) -> None:
+    try:
+        dump_json(_tick_cache_path(), {"version": _TICK_CACHE_VERSION, "fingerprint": fingerprint, "report": report})
+    except OSError:
+        pass  # the cache is an optimization only
 
 # ==================================
 # Main loop
@@ -682,6 +1128,17 @@ def main():
     args = parser.parse_args()
     dry = (args.mode == "dry_run")
 
+    # Unchanged workspace since an idle tick (nothing selected) → the same report; skip the work.
+    # Dry runs never read or write the tick cache, so they skip the fingerprint walk too.
+    fingerprint = None if dry else _workspace_fingerprint(args.mode)
+    if not dry:
+        cached = _load_tick_cache()
+        if cached and cached.get("fingerprint") == fingerprint:
+            report = cached["report"]
+            report["detailed_logs"].append(f"{now_iso()} Workspace unchanged since last tick; report reused.")
+            print_strict_output(**report)
+            return
+
     # DETAILED LOGS
     logs: List[str] = []
     logs.append(f"{now_iso()} Start Orchestrator: mode={args.mode}")
@@ -696,19 +1153,31 @@ def main():
         cmd = " ".join(["py", "-m", "pip", "install"] + missing_pkgs)
         blocking.append({"id": "env_yaml_missing", "code": ENVIRONMENT_MISMATCH, "action": f'Run in CMD:\n{cmd}'})
 
-    # Quick Fix-Gate detection via pytest
+    # One package-dir walk per tick, shared by preflight and the Fix-Gate derive/apply
+    pkg_dirs = _enumerate_py_package_dirs(_FIX_GATE_ROOTS)
+    conftest_stamp = state.setdefault("conftest_stamp", {})
+    conftest_stamp_before = dict(conftest_stamp)
+    pre = preflight_checks(pkg_dirs, conftest_stamp)
+
+    # Quick Fix-Gate detection via pytest — unless preflight already proves it would fail
     fix_gate_needed = False
-    tests_ok, cov, test_out = run_pytest_and_coverage()
-    logs.append(f"{now_iso()} pytest exit_ok={tests_ok} coverage={cov}%")
+    pytest_ran = bool(pre["import_app"] and pre["packages_discoverable"])
+    if not pytest_ran:
+        tests_ok, cov, test_out = False, 0.0, "pytest skipped: preflight reported import/package failure"
+        logs.append(f"{now_iso()} pytest skipped (import_app={pre['import_app']} packages_discoverable={pre['packages_discoverable']})")
+    else:
+        tests_ok, cov, test_out = run_pytest_and_coverage()
+        logs.append(f"{now_iso()} pytest exit_ok={tests_ok} coverage={cov}%")
     if not tests_ok or cov < COVERAGE_TARGET - 1e-6:
         fix_gate_needed = True
         logs.append(f"{now_iso()} Fix-Gate triggered.")
 
     overrides = list_overrides()
-    protected_set = set(state.get("protected_zone", {}).get("paths", []))
+    protected_set = state["_protected_set"]
 
     # 5) ORCHESTRATOR WORKFLOW
-    selected_info = pick_next_story(state, stories, overrides, fix_gate_needed)
+    ready_index = build_ready_index(state, stories)
+    selected_info = pick_next_story(state, stories, overrides, fix_gate_needed, ready_index)
     executor_output: Optional[Dict[str, Any]] = None
 
     # Progress snapshot
@@ -726,7 +1195,10 @@ def main():
         save_state(state)
         logs.append(f"{now_iso()} Selected story={sid} reason={reason}")
         # EXECUTOR — WORKFLOW
-        executor_output = executor_for_story(chosen, dry=dry, overrides=overrides, protected=protected_set)
+        executor_output = executor_for_story(chosen, dry=dry, overrides=overrides, protected=protected_set,
+                                             preflight=pre, pytest_result=(tests_ok, cov, test_out),
+                                             pytest_ran=pytest_ran, pkg_dirs=pkg_dirs,
+                                             artifact_stat=state.setdefault("artifact_stat", {}))
 
         classification = executor_output.get("classification")
         if classification == BLOCKED_NEEDS_OVERRIDE:
@@ -747,23 +1219,24 @@ def main():
             coverage_ok = executor_output["verification"]["coverage_ok"]
             if tests_ok and coverage_ok:
                 mark_state_story(state, sid, "done")
+                ready_index_mark(ready_index, sid, "done")
             else:
                 mark_state_story(state, sid, "blocked")
             # Update metrics
             state["metrics"]["throughput"] += executor_output["metrics_update"]["throughput"]
             state["metrics"]["error_rate"] = executor_output["metrics_update"]["error_rate"]
-            # Artifacts update
+            # Artifacts update — O(1) per touched file via the load-time path index
+            art_index = state.get("_artifacts_by_path")
+            if art_index is None:
+                art_index = _index_state_artifacts(state)
             for f, chk in executor_output["checkpoint"]["checksums"].items():
-                path_norm = f.replace("\\", "/")
-                updated = False
-                for art in state["artifacts_manifest"]:
-                    if art["path"] == path_norm:
-                        art["checksum"] = chk
-                        art["last_story"] = sid
-                        updated = True
-                        break
-                if not updated:
-                    state["artifacts_manifest"].append({"path": path_norm, "checksum": chk, "last_story": sid})
+                art = art_index.get(f)
+                if art is not None:
+                    art["checksum"] = chk
+                    art["last_story"] = sid
+                else:
+                    art_index[f] = art = {"path": f, "checksum": chk, "last_story": sid}
+                    state["artifacts_manifest"].append(art)
             # Coverage history
             state["coverage_history"].append({"timestamp": now_iso(), "percent": executor_output["verification"]["coverage"], "by_module": {}})
             # New resume token
@@ -771,17 +1244,12 @@ def main():
             save_state(state)
     else:
         logs.append(f"{now_iso()} No ready stories with dependencies satisfied.")
+        if not dry and conftest_stamp != conftest_stamp_before:
+            # Idle ticks save nothing else; persist the stamp so the next process skips the compile
+            save_state(state)
 
-    # Next ready candidates (ids)
-    next_ready = []
-    story_map = {s["id"]: s for s in stories}
-    status_map = {s["id"]: s.get("status", "ready") for s in state["stories"]}
-    for sid, s in story_map.items():
-        if status_map.get(sid, s.get("status","ready")) == "ready":
-            deps = s.get("dependencies", [])
-            if all(status_map.get(d, "done") == "done" for d in deps):
-                next_ready.append(sid)
-    next_ready = sorted(next_ready, key=lambda k: story_map[k].get("priority", 99))[:5]
+    # Next ready candidates (ids) — the index already reflects this tick's transition
+    next_ready = ready_index_peek(ready_index, 5)
 
     # Coverage metrics snapshot
     current_cov = cov
@@ -841,16 +1309,22 @@ def main():
         })
 
     # PRINT STRICT OUTPUT
-    print_strict_output(
-        status_next=status_next,
-        blocking_issues=blocking,
-        progress_metrics=progress_metrics,
-        detailed_logs=logs,
-        orchestrator_output=orchestrator_output,
-        executor_output=executor_output,
-        batch_complete=batch_complete,
-        release_notes=release_notes
-    )
+    report = {
+        "status_next": status_next,
+        "blocking_issues": blocking,
+        "progress_metrics": progress_metrics,
+        "detailed_logs": logs,
+        "orchestrator_output": orchestrator_output,
+        "executor_output": executor_output,
+        "batch_complete": batch_complete,
+        "release_notes": release_notes,
+    }
+    print_strict_output(**report)
+
+    # Only idle ticks are replayable: an executed story changes state, so the next tick differs.
+    # Re-fingerprint so anything that changed mid-tick (e.g. first-run dir creation) isn't cached.
+    if not dry and executor_output is None and _workspace_fingerprint(args.mode) == fingerprint:
+        _save_tick_cache(fingerprint, report)
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,5 @@
 ﻿import json
+import os
 import importlib
 from pathlib import Path
 
@@ -85,3 +86,67 @@ def test_thin_run_loop_no_ready_story(tmp_path):
     out = rl.thin_run_loop(str(tmp_path), protected_paths=[])
     assert out["status"] == "no_ready_story"
     assert out["selected"] is None and out["preflight"] is None
+
+def test_import_check_is_memoized_until_cleared(tmp_path, monkeypatch):
+    (tmp_path / "app").mkdir(parents=True, exist_ok=True)
+    (tmp_path / "app" / "__init__.py").write_text("", encoding="utf-8")
+
+    rl = importlib.import_module("app.executor.runloop")
+    rl.clear_import_check_cache()
+    assert rl._can_import_app(str(tmp_path)) == (True, None)  # noqa: SLF001
+
+    calls = []
+    monkeypatch.setattr(rl, "_can_import_app_uncached", lambda root, root_norm, loaded: calls.append(root) or (False, "x"))
+    assert rl._can_import_app(str(tmp_path)) == (True, None)  # noqa: SLF001
+    assert calls == []
+
+    rl.clear_import_check_cache()
+    assert rl._can_import_app(str(tmp_path)) == (False, "x")  # noqa: SLF001
+    # Failures are not memoized: every check re-runs the import
+    assert rl._can_import_app(str(tmp_path)) == (False, "x")  # noqa: SLF001
+    assert len(calls) == 2
+
+def test_import_check_sees_in_place_edits_of_app_modules(tmp_path):
+    pkg = tmp_path / "app"
+    pkg.mkdir(parents=True, exist_ok=True)
+    init = pkg / "__init__.py"
+    init.write_text("raise ImportError('broken')\n", encoding="utf-8")
+    helper = pkg / "helper.py"
+    helper.write_text("VALUE = 1\n", encoding="utf-8")
+
+    rl = importlib.import_module("app.executor.runloop")
+    rl.clear_import_check_cache()
+    ok, err = rl._can_import_app(str(tmp_path))  # noqa: SLF001
+    assert not ok and "broken" in err
+
+    # Fixed in place (directory mtimes unchanged): the next check must pass
+    init.write_text("from . import helper\n", encoding="utf-8")
+    assert rl._can_import_app(str(tmp_path)) == (True, None)  # noqa: SLF001
+
+    # Broken in place in a module app/__init__.py imports: the memoized pass is dropped
+    helper.write_text("raise ImportError('broken again')\n", encoding="utf-8")
+    ok, err = rl._can_import_app(str(tmp_path))  # noqa: SLF001
+    assert not ok and "broken again" in err
+
+def test_import_check_fast_path_when_app_already_loaded_from_root(monkeypatch):
+    import sys
+    rl = importlib.import_module("app.executor.runloop")
+    repo_root = Path(sys.modules["app"].__file__).resolve().parents[1]
+    # The heavy resolution path must not run when sys.modules["app"] already lives under root
+    monkeypatch.setattr(rl, "_can_import_app_uncached", lambda *a: (False, "should not be called"))
+    before = sys.modules["app"]
+    assert rl._can_import_app(str(repo_root)) == (True, None)  # noqa: SLF001
+    assert sys.modules["app"] is before
+
+def test_protected_conflicts_normalize_separators_and_dot_prefix():
+    rl = importlib.import_module("app.executor.runloop")
+    got = rl._check_protected_conflicts(  # noqa: SLF001
+        ["./app\\main.py", "app/other.py"], ("app/main.py", "tests/x.py"),
+    )
+    assert got == ["app/main.py"]
+    assert rl._check_protected_conflicts(None, None) == []  # noqa: SLF001
+
+def test_norm_path_joins_relative_without_cwd():
+    rl = importlib.import_module("app.executor.runloop")
+    assert rl._norm_path("app/./__init__.py", "/ws") == "/ws/app/__init__.py"  # noqa: SLF001
+    assert rl._norm_path(os.path.abspath("x/../y"), "/ws").endswith("/y")  # noqa: SLF001
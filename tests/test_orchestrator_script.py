@@ -0,0 +1,290 @@
+﻿import importlib
+import json
+import os
+import sys
+
+import pytest
+
+def _orch(tmp_path, monkeypatch):
+    o = importlib.import_module("orchestrator")
+    monkeypatch.setattr(o, "WORKSPACE_ROOT", str(tmp_path))
+    monkeypatch.setattr(o, "STATE_DIR", str(tmp_path / ".orchestrator"))
+    monkeypatch.setattr(o, "STATE_PATH", str(tmp_path / ".orchestrator" / "state.json"))
+    monkeypatch.setattr(o, "OVERRIDES_DIR", str(tmp_path / ".orchestrator" / "overrides"))
+    return o
+
+@pytest.mark.parametrize("dry", [True, False])
+def test_executor_reports_skipped_pytest_as_not_ran(tmp_path, monkeypatch, dry):
+    o = _orch(tmp_path, monkeypatch)
+
+    def no_pytest():
+        raise AssertionError("pytest must not run when nothing was touched")
+    monkeypatch.setattr(o, "run_pytest_and_coverage", no_pytest)
+    story = {"id": "S1", "allowed_paths": []}
+    out = o.executor_for_story(story, dry=dry, overrides={}, protected=frozenset(),
+                               preflight={}, pytest_result=(False, 0.0, "pytest skipped"),
+                               pytest_ran=False)
+    assert out["testing_report"]["ran"] is False
+    assert out["verification"]["tests_ok"] is False
+
+    out = o.executor_for_story(story, dry=dry, overrides={}, protected=frozenset(),
+                               preflight={}, pytest_result=(True, 99.0, "ok"))
+    assert out["testing_report"]["ran"] is True
+
+def test_router_check_retries_locked_files_and_tolerates_vanished_ones(tmp_path, monkeypatch):
+    o = _orch(tmp_path, monkeypatch)
+    routers = tmp_path / "app" / "routers"
+    routers.mkdir(parents=True)
+    (routers / "good.py").write_text("router = APIRouter()\n", encoding="utf-8")
+    (routers / "empty.py").write_text("", encoding="utf-8")
+    monkeypatch.setattr(o.time, "sleep", lambda s: None)
+
+    real_open = open
+    locked = {"good.py": 1}
+
+    def flaky_open(path, *a, **kw):
+        name = os.path.basename(path)
+        if locked.get(name, 0) > 0:
+            locked[name] -= 1
+            raise PermissionError("locked by AV scan")
+        return real_open(path, *a, **kw)
+    monkeypatch.setattr(o, "open", flaky_open, raising=False)
+    entries = {e.name: e for e in os.scandir(routers)}
+    assert o._router_file_ok(entries["good.py"]) is True  # noqa: SLF001 - second attempt succeeds
+    assert o._router_file_ok(entries["empty.py"]) is False  # noqa: SLF001
+
+    locked["good.py"] = 99
+    assert o._router_file_ok(entries["good.py"]) is False  # noqa: SLF001 - still locked: flagged, no raise
+    ok, notes = o._pf_routers()  # noqa: SLF001
+    assert ok is False and "good.py" in notes[0]
+
+    (routers / "empty.py").unlink()
+    assert o._router_file_ok(entries["empty.py"]) is True  # noqa: SLF001
+
+def test_fix_gate_and_preflight_share_one_package_walk(tmp_path, monkeypatch):
+    o = _orch(tmp_path, monkeypatch)
+    (tmp_path / "app" / "sub").mkdir(parents=True)
+    (tmp_path / "app" / "__init__.py").write_text("", encoding="utf-8")
+    (tmp_path / "app" / "sub" / "m.py").write_text("", encoding="utf-8")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_x.py").write_text("", encoding="utf-8")
+
+    pkg_dirs = o._enumerate_py_package_dirs(o._FIX_GATE_ROOTS)  # noqa: SLF001
+    assert pkg_dirs == [("app", True, True), ("app/sub", True, False), ("tests", True, False)]
+
+    def no_walk(roots):
+        raise AssertionError("package dirs re-walked")
+    monkeypatch.setattr(o, "_enumerate_py_package_dirs", no_walk)
+    # Only app/ dirs count for preflight, even though the shared walk also covers tests/
+    assert o._pf_packages(pkg_dirs) == (False, ["Missing __init__.py in: ['app/sub']"])  # noqa: SLF001
+    out = o.executor_for_story({"id": "fix_gate_imports_tests"}, dry=True, overrides={},
+                               protected=frozenset(), preflight={}, pytest_result=(True, 99.0, "ok"),
+                               pkg_dirs=pkg_dirs)
+    assert out["change_set"]["files"] == ["app/sub/__init__.py", "tests/__init__.py"]
+
+_PRE_OK = {
+    "import_app": True, "packages_discoverable": True, "tests_import_conftest": True,
+    "env_vars_present": True, "router_imports_consistent": True, "coverage_feasible": True,
+    "windows_specifics": True, "paths_respected": True, "sec_compliance_checklist": True, "notes": [],
+}
+
+def _tick_env(tmp_path, monkeypatch):
+    """orchestrator main() against tmp_path with preflight/pytest stubbed; returns (module, pytest call log)."""
+    o = _orch(tmp_path, monkeypatch)
+    (tmp_path / "backlog").mkdir()
+    calls = []
+    monkeypatch.setattr(o, "preflight_checks", lambda pkg_dirs=None, conftest_stamp=None: dict(_PRE_OK, notes=[]))
+    monkeypatch.setattr(o, "run_pytest_and_coverage", lambda: calls.append(1) or (True, 99.0, "ok"))
+    return o, calls
+
+def _tick(o, monkeypatch, capsys, mode="run"):
+    monkeypatch.setattr(sys, "argv", ["orchestrator.py", "--mode", mode])
+    o.main()
+    return capsys.readouterr().out
+
+def _run_until_cached(o, monkeypatch, capsys):
+    # The first tick creates .orchestrator/ mid-run, so it is not replayable; a later one is
+    for _ in range(3):
+        _tick(o, monkeypatch, capsys)
+        if os.path.exists(o._tick_cache_path()):  # noqa: SLF001
+            return
+    raise AssertionError("idle tick never cached")
+
+def test_idle_tick_report_is_replayed(tmp_path, monkeypatch, capsys):
+    o, calls = _tick_env(tmp_path, monkeypatch)
+    _run_until_cached(o, monkeypatch, capsys)
+    before = len(calls)
+    out = _tick(o, monkeypatch, capsys)
+    assert "report reused" in out
+    assert "No ready stories" in out
+    assert len(calls) == before  # nothing re-ran
+
+def test_tick_cache_misses_after_state_edit(tmp_path, monkeypatch, capsys):
+    o, calls = _tick_env(tmp_path, monkeypatch)
+    _run_until_cached(o, monkeypatch, capsys)
+    # Idle ticks leave state.json alone, so any write to it must invalidate the replay
+    state_path = tmp_path / ".orchestrator" / "state.json"
+    state_path.write_text(json.dumps(o.default_state()), encoding="utf-8")
+    before = len(calls)
+    out = _tick(o, monkeypatch, capsys)
+    assert "report reused" not in out
+    assert len(calls) == before + 1
+
+def test_tick_with_executor_is_not_cached(tmp_path, monkeypatch, capsys):
+    o, calls = _tick_env(tmp_path, monkeypatch)
+    _run_until_cached(o, monkeypatch, capsys)
+    idle = o._load_tick_cache()  # noqa: SLF001
+    (tmp_path / "backlog" / "s1.json").write_text(
+        json.dumps({"id": "S1", "title": "one", "status": "ready", "allowed_paths": []}), encoding="utf-8")
+    out = _tick(o, monkeypatch, capsys)
+    assert "Selected story=S1" in out
+    # The executed tick's report was not stored over the idle one
+    assert o._load_tick_cache() == idle  # noqa: SLF001
+
+def test_dry_run_skips_workspace_fingerprint(tmp_path, monkeypatch, capsys):
+    o, calls = _tick_env(tmp_path, monkeypatch)
+
+    def no_fingerprint(mode):
+        raise AssertionError("dry runs must not fingerprint the workspace")
+    monkeypatch.setattr(o, "_workspace_fingerprint", no_fingerprint)
+    out = _tick(o, monkeypatch, capsys, mode="dry_run")
+    assert "EXECUTIVE SUMMARY" in out
+    assert not os.path.exists(o._tick_cache_path())  # noqa: SLF001
+
+def _state_for(stories):
+    return {"stories": [{"id": s["id"], "status": s.get("status", "ready")} for s in stories]}
+
+def test_ready_index_orders_ties_by_backlog_order_and_unblocks_on_done(tmp_path, monkeypatch):
+    o = _orch(tmp_path, monkeypatch)
+    stories = [
+        {"id": "B", "priority": 1},
+        {"id": "A", "priority": 1},                            # tie with B: backlog order wins
+        {"id": "C", "priority": 0, "dependencies": ["B"]},     # best priority, blocked on B
+        {"id": "D", "priority": 2, "dependencies": ["B", "A"]},
+        {"id": "E", "priority": 3, "status": "done"},
+        {"id": "F", "priority": 4, "dependencies": ["E"]},     # dep already done
+        {"id": "G", "priority": 5, "dependencies": ["missing"]},  # unknown dep counts as done
+        {"id": "H", "priority": 6},
+        {"id": "I", "priority": 7},
+    ]
+    state = _state_for(stories)
+    index = o.build_ready_index(state, stories)
+    assert o.ready_index_peek(index, 5) == ["B", "A", "F", "G", "H"]
+
+    chosen, reason = o.pick_next_story(state, stories, {}, False, index)
+    assert (chosen["id"], reason) == ("B", "priority")
+    o.ready_index_mark(index, "B", "blocked")  # not done: unblocks nothing
+    assert "C" not in o.ready_index_peek(index, 10)
+    o.ready_index_mark(index, "B", "done")
+    assert o.ready_index_peek(index, 5) == ["C", "A", "F", "G", "H"]
+    assert o.pick_next_story(state, stories, {}, False, index)[0]["id"] == "C"
+    assert o.pick_next_story(state, stories, {}, False, index)[0]["id"] == "A"
+    o.ready_index_mark(index, "A", "done")  # D's last blocker
+    assert o.ready_index_peek(index, 2) == ["D", "F"]
+
+def test_ready_index_matches_linear_selection(tmp_path, monkeypatch):
+    import random
+    o = _orch(tmp_path, monkeypatch)
+    rng = random.Random(7)
+    for _ in range(200):
+        n = rng.randint(0, 12)
+        ids = [f"S{i}" for i in range(n)]
+        stories = [{"id": sid, "priority": rng.randint(0, 3),
+                    "status": rng.choice(["ready", "ready", "ready", "done", "blocked"]),
+                    "dependencies": rng.sample(ids, rng.randint(0, min(3, n)))} for sid in ids]
+        state = _state_for(stories)
+        status = {s["id"]: s["status"] for s in stories}
+        index = o.build_ready_index(state, stories)
+        while True:
+            # Reference: linear scan for the best ready story whose deps are all done
+            ready = [(s["priority"], i, s["id"]) for i, s in enumerate(stories)
+                     if status[s["id"]] == "ready" and all(status.get(d, "done") == "done" for d in s["dependencies"])]
+            assert o.ready_index_peek(index, 5) == [sid for _, _, sid in sorted(ready)[:5]]
+            picked = o.pick_next_story(state, stories, {}, False, index)
+            if not ready:
+                assert picked is None
+                break
+            assert picked[0]["id"] == min(ready)[2]
+            status[picked[0]["id"]] = "done"
+            o.ready_index_mark(index, picked[0]["id"], "done")
+
+def test_conftest_compile_is_skipped_while_its_stamp_is_unchanged(tmp_path, monkeypatch):
+    o = _orch(tmp_path, monkeypatch)
+    conf = tmp_path / "tests" / "conftest.py"
+    conf.parent.mkdir()
+    conf.write_text("X = 1\n", encoding="utf-8")
+    reads = []
+    real_read = o.retry_read
+    monkeypatch.setattr(o, "retry_read", lambda path, *a, **kw: reads.append(path) or real_read(path, *a, **kw))
+
+    stamps = {}
+    assert o._pf_conftest(stamps) == (True, [])  # noqa: SLF001
+    assert o._pf_conftest(stamps) == (True, [])  # noqa: SLF001
+    assert len(reads) == 1 and list(stamps) == [str(conf)]
+
+    conf.write_text("def broken(:\n", encoding="utf-8")
+    ok, notes = o._pf_conftest(stamps)  # noqa: SLF001
+    assert not ok and "conftest issues" in notes[0]
+    assert stamps == {}  # a failed compile is never recorded
+    assert o._pf_conftest(None)[0] is False  # no stamps: always compiles
+
+def test_idle_tick_persists_conftest_stamp(tmp_path, monkeypatch, capsys):
+    o, _ = _tick_env(tmp_path, monkeypatch)
+
+    def fake_preflight(pkg_dirs=None, conftest_stamp=None):
+        conftest_stamp["tests/conftest.py"] = [1, 2]
+        return dict(_PRE_OK, notes=[])
+    monkeypatch.setattr(o, "preflight_checks", fake_preflight)
+    _tick(o, monkeypatch, capsys, mode="dry_run")
+    assert not (tmp_path / ".orchestrator" / "state.json").exists()  # dry runs persist nothing when idle
+    _tick(o, monkeypatch, capsys)
+    saved = json.loads((tmp_path / ".orchestrator" / "state.json").read_text(encoding="utf-8"))
+    assert saved["conftest_stamp"] == {"tests/conftest.py": [1, 2]}
+
+@pytest.mark.parametrize("lines, expected", [
+    (["FAIL Required test coverage of 95% not reached. 90% Coverage", "TOTAL  385  14  114  5  96.39%"], 96.39),
+    (["TOTAL  23  1  95%", "TOTAL  23  1  80%"], 95.0),
+    (["Required 91% Coverage", "Required 85% Coverage"], 91.0),
+    (["no summary at all"], None),
+])
+def test_streamed_coverage_matches_full_output_parse(tmp_path, monkeypatch, lines, expected):
+    o = _orch(tmp_path, monkeypatch)
+
+    def fake_tail(cmd, cwd=None, on_line=None, env=None, **kw):
+        for line in lines:
+            on_line(line)
+        return 0, "\n".join(lines), ""
+    monkeypatch.setattr(o, "run_cmd_tail", fake_tail)
+    _, cov, out = o.run_pytest_and_coverage()
+    assert o.coverage_from_pytest_output(out) == expected
+    assert cov == (0.0 if expected is None else expected)
+
+def test_workspace_fingerprint_tolerates_files_vanishing_mid_walk(tmp_path, monkeypatch):
+    o = _orch(tmp_path, monkeypatch)
+    (tmp_path / "a.txt").write_text("a", encoding="utf-8")
+    os.makedirs(o.OVERRIDES_DIR)
+    with open(os.path.join(o.OVERRIDES_DIR, "S1.override.json"), "w", encoding="utf-8") as f:
+        f.write("{}")
+    before = o._workspace_fingerprint("run")  # noqa: SLF001
+
+    class _Gone:
+        # DirEntry stand-in for a file deleted between scandir and stat
+        def __init__(self, entry):
+            self._entry, self.name, self.path = entry, entry.name, entry.path
+        def stat(self, **kw):
+            raise FileNotFoundError(self.path)
+
+    real_iter, real_scandir = o.iter_workspace_files, o.os.scandir
+    monkeypatch.setattr(o, "iter_workspace_files",
+                        lambda root: ((_Gone(e), rel) for e, rel in real_iter(root)))
+
+    class _GoneScandir:
+        def __init__(self, path):
+            self._it = real_scandir(path)
+        def __enter__(self):
+            return (_Gone(e) for e in self._it.__enter__())
+        def __exit__(self, *exc):
+            return self._it.__exit__(*exc)
+    monkeypatch.setattr(o.os, "scandir",
+                        lambda p: _GoneScandir(p) if p == o.OVERRIDES_DIR else real_scandir(p))
+    assert o._workspace_fingerprint("run") != before  # noqa: SLF001
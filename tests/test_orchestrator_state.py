@@ -2,10 +2,50 @@
 import os
 from pathlib import Path
 import importlib
+import time
+
+import pytest
 
 def _read_json(p: Path) -> dict:
     return json.loads(p.read_text(encoding="utf-8"))
 
+def _reject_non_str_keys(obj):
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            if not isinstance(k, str):
+                raise TypeError("Dict key must be str")
+            _reject_non_str_keys(v)
+    elif isinstance(obj, list):
+        for v in obj:
+            _reject_non_str_keys(v)
+
+class _StdlibOrjson:
+    """The slice of orjson's API state.py uses, on stdlib json: runs the orjson branches without orjson."""
+    OPT_INDENT_2 = 1
+
+    @staticmethod
+    def dumps(obj, option=0):
+        _reject_non_str_keys(obj)
+        if option:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def loads(data):
+        # orjson accepts a memoryview; the caller releases it right after, so copy out
+        return json.loads(bytes(data))
+
+@pytest.fixture(params=["stand-in", "orjson"])
+def orjson_backend(request, monkeypatch):
+    """Point state.py's orjson at a stdlib stand-in, or at the real package when installed."""
+    state_mod = importlib.import_module("app.orchestrator.state")
+    if request.param == "orjson":
+        backend = pytest.importorskip("orjson")
+    else:
+        backend = _StdlibOrjson
+    monkeypatch.setattr(state_mod, "orjson", backend)
+    return backend
+
 def test_rebuild_when_missing(tmp_path):
     # Arrange: ensure a tangible artifact exists
     (tmp_path / "app").mkdir(parents=True, exist_ok=True)
@@ -50,6 +90,30 @@ def test_load_existing_valid_state(tmp_path):
     loaded = state_mod.load_state(str(tmp_path))
     assert loaded["last_updated"] == "2025-01-01T00:00:00Z"
 
+def test_state_manifest_is_columnar_on_disk(tmp_path):
+    (tmp_path / "app").mkdir(parents=True, exist_ok=True)
+    (tmp_path / "app" / "dummy.txt").write_text("hello", encoding="utf-8")
+    state_mod = importlib.import_module("app.orchestrator.state")
+    built = state_mod.rebuild_state(str(tmp_path))
+
+    on_disk = _read_json(tmp_path / ".orchestrator" / "state.json")
+    assert on_disk["version"] == 2
+    assert on_disk["artifacts_manifest"]["paths"] == [a["path"] for a in built["artifacts_manifest"]]
+    assert state_mod.load_state(str(tmp_path))["artifacts_manifest"] == built["artifacts_manifest"]
+
+def test_load_malformed_columnar_manifest_triggers_rebuild(tmp_path):
+    (tmp_path / "app").mkdir(parents=True, exist_ok=True)
+    (tmp_path / "app" / "dummy.txt").write_text("hello", encoding="utf-8")
+    state_mod = importlib.import_module("app.orchestrator.state")
+    state_mod.rebuild_state(str(tmp_path))
+    sf = tmp_path / ".orchestrator" / "state.json"
+    data = _read_json(sf)
+    data["artifacts_manifest"]["checksums"] = []
+    sf.write_text(json.dumps(data), encoding="utf-8")
+
+    loaded = state_mod.load_state(str(tmp_path))
+    assert any(a["path"] == "app/dummy.txt" for a in loaded["artifacts_manifest"])
+
 def test_load_corrupt_state_triggers_rebuild(tmp_path):
     # Write corrupt JSON → exercises json.JSONDecodeError branch
     orch = tmp_path / ".orchestrator"
@@ -75,6 +139,14 @@ def test_load_invalid_state_triggers_rebuild(tmp_path):
     state = state_mod.load_state(str(tmp_path))
     assert set(state.keys()) >= {"version","environment_fingerprint","artifacts_manifest"}
 
+def test_environment_fingerprint_cache_is_not_shared_with_callers():
+    state_mod = importlib.import_module("app.orchestrator.state")
+    fp = state_mod.compute_environment_fingerprint(["py -V"])
+    fp["run_commands"].append("pytest -q")
+    fp["libs"]["x"] = "1"
+    again = state_mod.compute_environment_fingerprint(["py -V"])
+    assert again["run_commands"] == ["py -V"] and again["libs"] == {}
+
 def test_compute_environment_fingerprint_with_commands():
     state_mod = importlib.import_module("app.orchestrator.state")
     fp = state_mod.compute_environment_fingerprint(["py -V","pytest -q"])
@@ -98,6 +170,17 @@ def test_artifacts_manifest_omits_dirs_and_suffixes(tmp_path):
     assert not any(".pytest_cache" in p for p in paths)
     assert not any(p.endswith("z.pyc") for p in paths)
 
+def test_artifacts_manifest_omits_git_file(tmp_path):
+    # Worktrees and submodules have a `.git` file, not a directory
+    (tmp_path / ".git").write_text("gitdir: ../.git/worktrees/wt\n", encoding="utf-8")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / ".git").write_text("gitdir: ../.git/modules/sub\n", encoding="utf-8")
+    (tmp_path / "sub" / "a.txt").write_text("a", encoding="utf-8")
+
+    state_mod = importlib.import_module("app.orchestrator.state")
+    paths = [a["path"] for a in state_mod.compute_artifacts_manifest(str(tmp_path))]
+    assert [p.replace("\\", "/") for p in paths] == ["sub/a.txt"]
+
 def test_artifacts_manifest_handles_permissionerror(tmp_path, monkeypatch):
     # Simulate PermissionError for a specific file to exercise the except branch
     target = (tmp_path / "keep2")
@@ -108,13 +191,235 @@ def test_artifacts_manifest_handles_permissionerror(tmp_path, monkeypatch):
     state_mod = importlib.import_module("app.orchestrator.state")
     real_sha = state_mod._sha256_file  # noqa: SLF001 (accessing internal for test)
 
-    def fake_sha(path):
+    def fake_sha(path, size=None):
         # Raise only for our target to stay deterministic
         if str(path).replace("\\","/").endswith("keep2/blocked.txt"):
             raise PermissionError("nope")
-        return real_sha(path)
+        return real_sha(path, size)
 
     monkeypatch.setattr(state_mod, "_sha256_file", fake_sha)
     artifacts = state_mod.compute_artifacts_manifest(str(tmp_path))
     # The blocked file should be skipped (not present); the function must still succeed
     assert not any(p["path"].endswith("keep2/blocked.txt") for p in artifacts)
+
+def test_artifacts_manifest_reuses_hash_cache(tmp_path, monkeypatch):
+    (tmp_path / "keep").mkdir(parents=True, exist_ok=True)
+    f = tmp_path / "keep" / "a.txt"
+    f.write_text("one", encoding="utf-8")
+
+    state_mod = importlib.import_module("app.orchestrator.state")
+    first = state_mod.compute_artifacts_manifest(str(tmp_path))
+    assert (tmp_path / ".orchestrator" / "hash_cache.json").exists()
+
+    # Warm run: unchanged files must not be re-hashed
+    def boom(path, size=None):
+        raise AssertionError("cache miss for unchanged file")
+    monkeypatch.setattr(state_mod, "_sha256_file", boom)
+    assert state_mod.compute_artifacts_manifest(str(tmp_path)) == first
+
+    # Changed size → cache miss → re-hash
+    monkeypatch.undo()
+    f.write_text("changed", encoding="utf-8")
+    third = state_mod.compute_artifacts_manifest(str(tmp_path))
+    assert third[0]["checksum"] != first[0]["checksum"]
+
+def test_hash_cache_inode_mismatch_forces_rehash(tmp_path):
+    (tmp_path / "keep").mkdir(parents=True, exist_ok=True)
+    (tmp_path / "keep" / "a.txt").write_text("one", encoding="utf-8")
+    state_mod = importlib.import_module("app.orchestrator.state")
+    first = state_mod.compute_artifacts_manifest(str(tmp_path))
+
+    # Same mtime/size but a different inode: the cached digest must not be trusted
+    cache_fp = tmp_path / ".orchestrator" / "hash_cache.json"
+    data = json.loads(cache_fp.read_text(encoding="utf-8"))
+    entry = data["entries"]["keep/a.txt"]
+    entry[2] += 1
+    entry[3] = "0" * 64
+    cache_fp.write_text(json.dumps(data), encoding="utf-8")
+    state_mod.clear_hash_cache_memo()
+    assert state_mod.compute_artifacts_manifest(str(tmp_path)) == first
+
+def test_hash_cache_memo_skips_reparse(tmp_path, monkeypatch):
+    (tmp_path / "keep").mkdir(parents=True, exist_ok=True)
+    (tmp_path / "keep" / "a.txt").write_text("one", encoding="utf-8")
+    state_mod = importlib.import_module("app.orchestrator.state")
+    state_mod.compute_artifacts_manifest(str(tmp_path))
+
+    def boom(fp):
+        raise AssertionError("hash cache re-parsed while unchanged")
+    monkeypatch.setattr(state_mod, "_read_json", boom)
+    assert "keep/a.txt" in state_mod._load_hash_cache(str(tmp_path))  # noqa: SLF001
+
+def test_sha256_matches_for_small_and_chunked_files(tmp_path, monkeypatch):
+    import hashlib
+    state_mod = importlib.import_module("app.orchestrator.state")
+    monkeypatch.setattr(state_mod, "_HASH_CHUNK", 4096)  # several readinto() rounds per file
+    for size in (0, 10, state_mod._CHUNKED_HASH_MIN + 1):  # noqa: SLF001
+        f = tmp_path / f"f{size}.bin"
+        data = os.urandom(size)
+        f.write_bytes(data)
+        assert state_mod._sha256_file(str(f)) == hashlib.sha256(data).hexdigest()  # noqa: SLF001
+
+def test_sha256_reads_small_files_to_eof_despite_short_reads(tmp_path, monkeypatch):
+    import hashlib
+    state_mod = importlib.import_module("app.orchestrator.state")
+    data = os.urandom(1000)
+    f = tmp_path / "f.bin"
+    f.write_bytes(data)
+    real_read = os.read
+    calls = []
+
+    def short_read(fd, n):
+        calls.append(n)
+        return real_read(fd, min(n, 7))
+    monkeypatch.setattr(state_mod.os, "read", short_read)
+    assert state_mod._sha256_file(str(f), len(data)) == hashlib.sha256(data).hexdigest()  # noqa: SLF001
+    assert len(calls) > 1
+
+def test_sha256_rejects_size_mismatch_with_walk(tmp_path):
+    state_mod = importlib.import_module("app.orchestrator.state")
+    small = tmp_path / "small.bin"
+    small.write_bytes(b"x" * 10)
+    big = tmp_path / "big.bin"
+    big.write_bytes(b"x" * (state_mod._CHUNKED_HASH_MIN + 10))  # noqa: SLF001
+    # Stale st_size: the file grew (or shrank) after the walk stat'ed it
+    for f, stale in ((small, 5), (big, state_mod._CHUNKED_HASH_MIN + 1)):  # noqa: SLF001
+        with pytest.raises(OSError):
+            state_mod._sha256_file(str(f), stale)  # noqa: SLF001
+        assert state_mod._try_sha256_file(str(f), stale) is None  # noqa: SLF001
+
+def test_sha256_skips_file_truncated_after_walk(tmp_path):
+    state_mod = importlib.import_module("app.orchestrator.state")
+    f = tmp_path / "big.bin"
+    f.write_bytes(os.urandom(3 * state_mod._CHUNKED_HASH_MIN))  # noqa: SLF001
+    stale = f.stat().st_size
+    f.write_bytes(b"")  # emptied between the walk's stat and the hash
+    assert state_mod._try_sha256_file(str(f), stale) is None  # noqa: SLF001
+
+def test_hash_cache_ignored_on_version_mismatch(tmp_path):
+    orch = tmp_path / ".orchestrator"
+    orch.mkdir(parents=True, exist_ok=True)
+    (orch / "hash_cache.json").write_text(json.dumps({"version": -1, "entries": {"x": [0, 0, "y"]}}), encoding="utf-8")
+    state_mod = importlib.import_module("app.orchestrator.state")
+    assert state_mod._load_hash_cache(str(tmp_path)) == {}  # noqa: SLF001
+
+def test_hash_cache_ignored_for_other_digest(tmp_path):
+    orch = tmp_path / ".orchestrator"
+    orch.mkdir(parents=True, exist_ok=True)
+    state_mod = importlib.import_module("app.orchestrator.state")
+    payload = {"version": state_mod._HASH_CACHE_VERSION, "algo": "blake3", "entries": {"x": [0, 0, 0, "y"]}}  # noqa: SLF001
+    (orch / "hash_cache.json").write_text(json.dumps(payload), encoding="utf-8")
+    assert state_mod._load_hash_cache(str(tmp_path)) == {}  # noqa: SLF001
+
+def test_artifacts_manifest_parallel_hashing_matches_serial(tmp_path, monkeypatch):
+    state_mod = importlib.import_module("app.orchestrator.state")
+    d = tmp_path / "many"
+    d.mkdir(parents=True, exist_ok=True)
+    for i in range(state_mod._PARALLEL_HASH_MIN + 5):  # noqa: SLF001
+        (d / f"f{i:03d}.txt").write_text(f"payload {i}", encoding="utf-8")
+
+    parallel = state_mod.compute_artifacts_manifest(str(tmp_path))
+    (tmp_path / ".orchestrator" / "hash_cache.json").unlink()
+    monkeypatch.setattr(state_mod, "_PARALLEL_HASH_MIN", 10**9)
+    serial = state_mod.compute_artifacts_manifest(str(tmp_path))
+    assert parallel == serial
+    assert [a["path"] for a in parallel] == sorted(a["path"] for a in parallel)
+
+def test_hash_cache_write_failure_is_ignored(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text("x", encoding="utf-8")
+    state_mod = importlib.import_module("app.orchestrator.state")
+
+    def ro(*_a, **_k):
+        raise OSError("read-only")
+    monkeypatch.setattr(state_mod, "_write_json_no_bom", ro)
+    artifacts = state_mod.compute_artifacts_manifest(str(tmp_path))
+    assert [a["path"] for a in artifacts] == ["a.txt"]
+
+def test_state_write_is_atomic_and_stale_tmp_removed(tmp_path, monkeypatch):
+    state_mod = importlib.import_module("app.orchestrator.state")
+    orch = tmp_path / ".orchestrator"
+    state = state_mod.load_state(str(tmp_path))
+    sf = orch / "state.json"
+    good = sf.read_text(encoding="utf-8")
+
+    # A failing replace must leave the previous file untouched and no temp behind
+    def fail_replace(src, dst):
+        raise OSError("locked")
+    monkeypatch.setattr(state_mod.os, "replace", fail_replace)
+    with pytest.raises(OSError):
+        state_mod.rebuild_state(str(tmp_path))
+    monkeypatch.undo()
+    assert sf.read_text(encoding="utf-8") == good
+    assert not [p for p in orch.iterdir() if ".tmp-" in p.name]
+
+    # Old leftovers from a crashed writer are cleaned up on load, for both atomic files;
+    # a fresh temp may be a live writer's and is left for its os.replace()
+    old = time.time() - state_mod._STALE_TMP_AGE - 60  # noqa: SLF001
+    for name in ("state.json.tmp-99999", "hash_cache.json.tmp-99999", "state.json.tmp-99998"):
+        (orch / name).write_text("{ partial", encoding="utf-8")
+    for name in ("state.json.tmp-99999", "hash_cache.json.tmp-99999"):
+        os.utime(orch / name, (old, old))
+    (orch / "notes.txt.tmp-1").write_text("not ours", encoding="utf-8")
+    os.utime(orch / "notes.txt.tmp-1", (old, old))
+    loaded = state_mod.load_state(str(tmp_path))
+    assert loaded["resume_token"] == state["resume_token"]
+    assert sorted(p.name for p in orch.iterdir() if ".tmp-" in p.name) == ["notes.txt.tmp-1", "state.json.tmp-99998"]
+
+@pytest.mark.parametrize("indent", [None, 2, 4])
+def test_json_writer_round_trips_with_and_without_orjson(tmp_path, monkeypatch, orjson_backend, indent):
+    state_mod = importlib.import_module("app.orchestrator.state")
+    data = {"name": "caf\u00e9", "n": [1, 2.5, None, True], "nested": {"k": "v"}}
+    fast = tmp_path / "fast.json"
+    state_mod._write_json_no_bom(str(fast), data, indent=indent)  # noqa: SLF001
+    if indent in (None, 2):
+        # orjson branch wrote it: exactly its bytes, no BOM
+        assert fast.read_bytes() == orjson_backend.dumps(data, option=orjson_backend.OPT_INDENT_2 if indent else 0)
+    monkeypatch.setattr(state_mod, "orjson", None)
+    slow = tmp_path / "slow.json"
+    state_mod._write_json_no_bom(str(slow), data, indent=indent)  # noqa: SLF001
+    for f in (fast, slow):
+        raw = f.read_bytes()
+        assert not raw.startswith(b"\xef\xbb\xbf")
+        assert json.loads(raw.decode("utf-8")) == data
+        assert state_mod._read_json(str(f)) == data  # noqa: SLF001
+
+def test_json_writer_completes_short_writes(tmp_path, monkeypatch, orjson_backend):
+    state_mod = importlib.import_module("app.orchestrator.state")
+    data = {"entries": {f"f{i}": "x" * 32 for i in range(20)}}
+    real_write = os.write
+    calls = []
+
+    def short_write(fd, buf):
+        # The kernel may accept fewer bytes than asked; take at most 7 per call
+        calls.append(len(buf))
+        return real_write(fd, bytes(buf[:7]))
+
+    monkeypatch.setattr(state_mod.os, "write", short_write)
+    out = tmp_path / "short.json"
+    state_mod._write_json_no_bom(str(out), data, indent=None)  # noqa: SLF001
+    monkeypatch.undo()
+    assert len(calls) > 1
+    assert json.loads(out.read_bytes()) == data
+    assert not [p for p in tmp_path.iterdir() if ".tmp-" in p.name]
+
+def test_json_writer_falls_back_for_non_str_keys(tmp_path, orjson_backend):
+    state_mod = importlib.import_module("app.orchestrator.state")
+    out = tmp_path / "keys.json"
+    state_mod._write_json_no_bom(str(out), {1: "one"})  # noqa: SLF001
+    assert json.loads(out.read_text(encoding="utf-8")) == {"1": "one"}
+
+def test_read_json_maps_large_files(tmp_path, monkeypatch, orjson_backend):
+    state_mod = importlib.import_module("app.orchestrator.state")
+    data = {"entries": {f"file_{i:05d}.txt": [i, i * 2, "0" * 64] for i in range(200)}}
+    big = tmp_path / "big.json"
+    big.write_text(json.dumps(data), encoding="utf-8")
+    assert big.stat().st_size > state_mod._MMAP_MIN  # noqa: SLF001
+    seen = []
+    real_loads = orjson_backend.loads
+    monkeypatch.setattr(state_mod.orjson, "loads", lambda b: seen.append(type(b)) or real_loads(b))
+    assert state_mod._read_json(str(big)) == data  # noqa: SLF001
+    assert seen == [memoryview]  # parsed from the mapping, not a read() copy
+    # Corrupt large file still surfaces as ValueError for the rebuild branches
+    big.write_text("{" * (state_mod._MMAP_MIN + 1), encoding="utf-8")  # noqa: SLF001
+    with pytest.raises(ValueError):
+        state_mod._read_json(str(big))  # noqa: SLF001
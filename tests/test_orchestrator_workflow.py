@@ -88,6 +88,16 @@ def test_discover_defaults_for_missing_fields(tmp_path):
     assert s["priority"] == 999
     assert s["dependencies"] == []
 
+def test_discover_default_dependencies_not_shared(tmp_path):
+    import json, importlib
+    wf = importlib.import_module("app.orchestrator.workflow")
+    b = tmp_path / "backlog"; b.mkdir(parents=True, exist_ok=True)
+    for sid in ("S1", "S2"):
+        (b / f"{sid}.json").write_text(json.dumps({"id": sid}), encoding="utf-8")
+    s1, s2 = wf.discover_backlog(str(tmp_path))
+    s1["dependencies"].append("X")
+    assert s2["dependencies"] == []
+
 def test_pick_next_none_when_no_candidates_due_to_unsatisfied_deps():
     import importlib
     wf = importlib.import_module("app.orchestrator.workflow")
@@ -135,3 +145,65 @@ def test_pick_next_deterministic_order_on_priority_tie(tmp_path):
     found = wf.discover_backlog(str(tmp_path))
     assert [s["id"] for s in found][:2] == ["A","B"]
     assert wf.pick_next(found)["id"] == "A"
+
+def test_discover_backlog_parallel_load_matches_order(tmp_path):
+    import json, importlib
+    wf = importlib.import_module("app.orchestrator.workflow")
+    b = tmp_path / "backlog"; b.mkdir(parents=True, exist_ok=True)
+    n = wf._PARALLEL_LOAD_MIN + 4  # noqa: SLF001
+    for i in range(n):
+        (b / f"s{i:02d}.json").write_text(json.dumps({"id": f"S{i:02d}", "title": f"T{i:02d}", "priority": n - i}), encoding="utf-8")
+    (b / "broken.json").write_text("{ nope", encoding="utf-8")
+    found = wf.discover_backlog(str(tmp_path))
+    assert [s["id"] for s in found] == [f"S{i:02d}" for i in reversed(range(n))]
+
+def test_yaml_parser_value_coercion(tmp_path):
+    import importlib
+    wf = importlib.import_module("app.orchestrator.workflow")
+    p = tmp_path / "s.yaml"
+    p.write_text(
+        "id: 'Q1'\n"
+        "  title: plain words\n"
+        "empty:\n"
+        "next: 1\n"
+        "deps: [\"A\", \"B\"]\n"
+        "broken: [x\n",
+        encoding="utf-8",
+    )
+    data = wf._load_any(str(p))  # noqa: SLF001
+    assert data == {"id": "Q1", "title": "plain words", "empty": "", "next": 1,
+                    "deps": ["A", "B"], "broken": "[x"}
+
+def test_yaml_parser_handles_crlf_and_utf8(tmp_path):
+    import importlib
+    wf = importlib.import_module("app.orchestrator.workflow")
+    p = tmp_path / "s.yaml"
+    p.write_bytes("id: S9\r\ntitle: café\r\nnaïve: 'yes'\r\npriority: 3\r\n".encode("utf-8"))
+    data = wf._load_any(str(p))  # noqa: SLF001
+    assert data == {"id": "S9", "title": "café", "naïve": "yes", "priority": 3}
+
+def test_discover_backlog_memoized_and_copies(tmp_path, monkeypatch):
+    import json, importlib, os
+    wf = importlib.import_module("app.orchestrator.workflow")
+    b = tmp_path / "backlog"; b.mkdir(parents=True, exist_ok=True)
+    story = b / "a.json"
+    story.write_text(json.dumps({"id": "A", "title": "A", "status": "ready"}), encoding="utf-8")
+
+    first = wf.discover_backlog(str(tmp_path))
+    first[0]["status"] = "done"  # caller mutation must not poison the cache
+    first.append({"id": "extra"})
+
+    monkeypatch.setattr(wf, "_safe_load", lambda fp: (_ for _ in ()).throw(AssertionError("reparsed")))
+    second = wf.discover_backlog(str(tmp_path))
+    assert second[0]["status"] == "ready"
+    assert len(second) == 1 and second[0] is not first[0]
+
+    # In-place edit (new size + mtime) invalidates the entry
+    monkeypatch.undo()
+    story.write_text(json.dumps({"id": "A", "title": "A", "status": "blocked"}), encoding="utf-8")
+    st = story.stat()
+    os.utime(story, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert wf.discover_backlog(str(tmp_path))[0]["status"] == "blocked"
+
+    wf.clear_backlog_cache()
+    assert wf._BACKLOG_CACHE == {}  # noqa: SLF001